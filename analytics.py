@@ -0,0 +1,222 @@
+import statistics
+from datetime import datetime, timedelta
+from app import db
+from archive import reaches_archive
+from models import (CheckIn, CheckInArchive, Event, EventArchive, FeedbackSummary, Registration,
+                    RegistrationArchive, User)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Breakdowns the report offers, each a key computed per confirmed registration
+DIMENSIONS = ('department', 'year_of_study', 'event_type', 'week')
+
+def _columns(result):
+    """Turn a result into ``{column name: list of values}``."""
+    names = list(result.keys())
+    rows = result.all()
+    if not rows:
+        return {name: [] for name in names}
+    return {name: list(values) for name, values in zip(names, zip(*rows))}
+
+def _concat(parts):
+    merged = {name: [] for name in parts[0]}
+    for part in parts:
+        for name, values in part.items():
+            merged[name].extend(values)
+    return merged
+
+def _sources(start):
+    """(event, registration, check-in, feedback count, rating sum) tables to read; the archive only when in range."""
+    hot = (Event, Registration, CheckIn,
+           db.func.coalesce(FeedbackSummary.feedback_count, 0), db.func.coalesce(FeedbackSummary.rating_sum, 0))
+    if not reaches_archive(start):
+        return [hot]
+    return [hot, (EventArchive, RegistrationArchive, CheckInArchive,
+                  EventArchive.feedback_count, EventArchive.rating_sum)]
+
+def snapshot(college_id, start=None, end=None, now=None):
+    """Columnar snapshot of a college's finished events starting in ``[start, end]``: three bulk queries per source.
+
+    Returns ``(events, registrations, check_ins)``, each a dict of column
+    lists. Registrations are the confirmed ones, carrying the student's
+    department and year; only finished events count, so a missing check-in
+    really is a no-show.
+    """
+    now = now or datetime.utcnow()
+    events, registrations, check_ins = [], [], []
+    for event, registration, check_in, feedback_count, rating_sum in _sources(start):
+        scope = [event.college_id == college_id, event.end_time < now]
+        if start:
+            scope.append(event.start_time >= start)
+        if end:
+            scope.append(event.start_time <= end)
+
+        query = db.select(event.id, event.event_type, event.start_time,
+                          feedback_count.label('feedback_count'), rating_sum.label('rating_sum')).where(*scope)
+        if event is Event:
+            query = query.outerjoin(FeedbackSummary, FeedbackSummary.event_id == Event.id)
+        events.append(_columns(db.session.execute(query)))
+
+        registrations.append(_columns(db.session.execute(
+            db.select(registration.event_id, registration.user_id, User.department, User.year_of_study)
+              .join(event, event.id == registration.event_id)
+              .join(User, User.id == registration.user_id)
+              .where(registration.status == 'confirmed', *scope)
+        )))
+        check_ins.append(_columns(db.session.execute(
+            db.select(check_in.event_id, check_in.user_id)
+              .join(event, event.id == check_in.event_id)
+              .where(*scope)
+        )))
+    return _concat(events), _concat(registrations), _concat(check_ins)
+
+def _factorize(values):
+    """Integer codes for ``values`` plus the distinct labels they index, in first-seen order."""
+    index = {}
+    codes = [index.setdefault(value, len(index)) for value in values]
+    return codes, list(index)
+
+def _bincount(codes, size, weights=None):
+    """Per-code counts (or weight sums) in one pass; NumPy's bincount when it is installed."""
+    if np is not None and codes:
+        return np.bincount(np.asarray(codes), weights=None if weights is None else np.asarray(weights),
+                           minlength=size).tolist()
+    totals = [0] * size
+    if weights is None:
+        for code in codes:
+            totals[code] += 1
+    else:
+        for code, weight in zip(codes, weights):
+            totals[code] += weight
+    return totals
+
+def rate(numerator, denominator):
+    return round(numerator / denominator * 100, 1) if denominator else None
+
+def _sort_key(key):
+    # Unknown departments/years sort last
+    return (key is None, key if key is not None else 0)
+
+def _totals(keys, attended):
+    """Confirmed, attended, attendance and no-show rate per distinct key, in first-seen order."""
+    codes, labels = _factorize(keys)
+    confirmed = _bincount(codes, len(labels))
+    present = _bincount(codes, len(labels), attended)
+    return [{
+        "key": label,
+        "confirmed": c,
+        "attended": int(a),
+        "attendance_rate": rate(a, c),
+        "no_show_rate": rate(c - a, c)
+    } for label, c, a in zip(labels, confirmed, present)]
+
+def _breakdown(keys, attended):
+    return sorted(_totals(keys, attended), key=lambda row: _sort_key(row["key"]))
+
+def _week_of(moment):
+    monday = moment.date() - timedelta(days=moment.weekday())
+    return monday.isoformat()
+
+def _correlation(xs, ys):
+    try:
+        return round(statistics.correlation(xs, ys), 3)
+    except statistics.StatisticsError:
+        # Fewer than two events with feedback, or no variation to correlate
+        return None
+
+def attendance_analytics(college_id, start=None, end=None, now=None):
+    """Attendance and no-show rates by department, year, event type and week, plus
+    per-year weekly trends and the correlation between attendance and average rating.
+
+    Every figure is computed over whole columns of the snapshot: registrations
+    are matched to check-ins and events once, then each breakdown is a
+    factorize plus two bincounts.
+    """
+    events, registrations, check_ins = snapshot(college_id, start, end, now)
+
+    # Gather per-registration event attributes through an event-id -> row index
+    event_row = {event_id: i for i, event_id in enumerate(events['id'])}
+    rows = [event_row[event_id] for event_id in registrations['event_id']]
+    weeks_by_event = [_week_of(moment) for moment in events['start_time']]
+    checked_in = set(zip(check_ins['event_id'], check_ins['user_id']))
+    attended = [int(pair in checked_in) for pair in zip(registrations['event_id'], registrations['user_id'])]
+
+    keys = {
+        "department": registrations['department'],
+        "year_of_study": registrations['year_of_study'],
+        "event_type": [events['event_type'][row] for row in rows],
+        "week": [weeks_by_event[row] for row in rows],
+    }
+    breakdowns = {dimension: _breakdown(keys[dimension], attended) for dimension in DIMENSIONS}
+
+    # Cohort trend: one attendance series per year of study across the weeks
+    weeks = sorted(set(keys["week"]))
+    cohorts = {}
+    for row in _totals(list(zip(keys["year_of_study"], keys["week"])), attended):
+        year, week = row["key"]
+        cohorts.setdefault(year, dict.fromkeys(weeks))[week] = row["attendance_rate"]
+    trends = {
+        "weeks": weeks,
+        "cohorts": [{"year_of_study": year, "attendance_rate": [series[week] for week in weeks]}
+                    for year, series in sorted(cohorts.items(), key=lambda item: _sort_key(item[0]))]
+    }
+
+    # Per-event attendance against the event's average rating
+    per_event_confirmed = _bincount(rows, len(events['id']))
+    per_event_attended = _bincount(rows, len(events['id']), attended)
+    pairs = [(a / c, ratings / count)
+             for c, a, count, ratings in zip(per_event_confirmed, per_event_attended,
+                                              events['feedback_count'], events['rating_sum'])
+             if c and count]
+    feedback = {
+        "events_with_feedback": len(pairs),
+        "attendance_rating_correlation": _correlation(*zip(*pairs)) if len(pairs) >= 2 else None
+    }
+
+    total_attended = sum(attended)
+    return {
+        "summary": {
+            "events": len(events['id']),
+            "confirmed": len(attended),
+            "attended": total_attended,
+            "attendance_rate": rate(total_attended, len(attended)),
+            "no_show_rate": rate(len(attended) - total_attended, len(attended))
+        },
+        "breakdowns": breakdowns,
+        "trends": trends,
+        "feedback": feedback
+    }
+
+def sql_breakdowns(college_id, start=None, end=None, now=None):
+    """The department/year/type breakdowns as plain GROUP BY queries over the hot tables, for benchmarking."""
+    now = now or datetime.utcnow()
+    scope = [Event.college_id == college_id, Event.end_time < now, Registration.status == 'confirmed']
+    if start:
+        scope.append(Event.start_time >= start)
+    if end:
+        scope.append(Event.start_time <= end)
+
+    attended = db.func.count(CheckIn.id)
+    confirmed = db.func.count(Registration.id)
+    results = {}
+    for dimension, column in (('department', User.department), ('year_of_study', User.year_of_study),
+                              ('event_type', Event.event_type)):
+        rows = db.session.execute(
+            db.select(column, confirmed, attended)
+              .select_from(Registration)
+              .join(Event, Event.id == Registration.event_id)
+              .join(User, User.id == Registration.user_id)
+              .outerjoin(CheckIn, db.and_(CheckIn.event_id == Registration.event_id,
+                                          CheckIn.user_id == Registration.user_id))
+              .where(*scope)
+              .group_by(column)
+        ).all()
+        results[dimension] = sorted(
+            ({"key": key, "confirmed": c, "attended": a, "attendance_rate": rate(a, c), "no_show_rate": rate(c - a, c)}
+             for key, c, a in rows),
+            key=lambda row: _sort_key(row["key"])
+        )
+    return results
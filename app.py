@@ -4,7 +4,10 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.schema import CreateIndex
 from werkzeug.middleware.proxy_fix import ProxyFix
+from cache import ReportCache, UserCache, make_backend
+from instrumentation import init_query_instrumentation
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -26,30 +29,123 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_pre_ping": True,
 }
 
+# configure the report cache (memory:// per worker, or redis://... shared between workers)
+app.config["REPORT_CACHE_URL"] = os.environ.get("REPORT_CACHE_URL", "memory://")
+app.config["REPORT_CACHE_MAX_ENTRIES"] = int(os.environ.get("REPORT_CACHE_MAX_ENTRIES", 512))
+app.config["REPORT_CACHE_TTL"] = int(os.environ.get("REPORT_CACHE_TTL", 300))
+
 # initialize the app with the extension
 db.init_app(app)
 
+# per-request query count/time in Server-Timing, with an N+1 guard
+app.config["SQL_REPEAT_THRESHOLD"] = int(os.environ.get("SQL_REPEAT_THRESHOLD", 20))
+init_query_instrumentation(app)
+
+report_cache = ReportCache.from_url(app.config["REPORT_CACHE_URL"],
+                                    max_entries=app.config["REPORT_CACHE_MAX_ENTRIES"],
+                                    ttl=app.config["REPORT_CACHE_TTL"])
+
+# identity snapshots for current_user, so authenticated requests skip the user-table lookup
+app.config["USER_CACHE_TTL"] = int(os.environ.get("USER_CACHE_TTL", 60))
+app.config["USER_CACHE_MAX_ENTRIES"] = int(os.environ.get("USER_CACHE_MAX_ENTRIES", 10000))
+
+# password hashing runs in a bounded process pool; changing the method rehashes users on next login
+app.config["PASSWORD_HASH_METHOD"] = os.environ.get("PASSWORD_HASH_METHOD", "scrypt")
+app.config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1)))
+app.config["PASSWORD_HASH_MAX_PENDING"] = int(os.environ.get("PASSWORD_HASH_MAX_PENDING",
+                                                             app.config["PASSWORD_HASH_WORKERS"] * 8 or 1))
+app.config["PASSWORD_HASH_WAIT"] = float(os.environ.get("PASSWORD_HASH_WAIT", 5))
+# lifetime of password reset links issued to imported accounts
+app.config["PASSWORD_RESET_MAX_AGE"] = int(os.environ.get("PASSWORD_RESET_MAX_AGE", 14 * 24 * 3600))
+
+# bulk roster import: users inserted (and committed) per transaction
+app.config["ROSTER_CHUNK_SIZE"] = int(os.environ.get("ROSTER_CHUNK_SIZE", 1000))
+
+# background report jobs: worker threads, and how long an unfinished job may be joined by identical requests
+app.config["REPORT_JOB_WORKERS"] = int(os.environ.get("REPORT_JOB_WORKERS", 2))
+app.config["REPORT_JOB_TIMEOUT"] = int(os.environ.get("REPORT_JOB_TIMEOUT", 900))
+
+# live counter push (SSE): update batching window, keepalive interval and per-worker client cap
+app.config["LIVE_UPDATE_INTERVAL"] = float(os.environ.get("LIVE_UPDATE_INTERVAL", 1.0))
+app.config["LIVE_HEARTBEAT"] = float(os.environ.get("LIVE_HEARTBEAT", 15))
+app.config["LIVE_MAX_SUBSCRIBERS"] = int(os.environ.get("LIVE_MAX_SUBSCRIBERS", 2000))
+app.config["LIVE_MAX_EVENTS"] = int(os.environ.get("LIVE_MAX_EVENTS", 100))
+
+# dashboard event lists held per worker; the longest another worker's event write can go unseen
+app.config["UPCOMING_INDEX_MAX_AGE"] = int(os.environ.get("UPCOMING_INDEX_MAX_AGE", 60))
+
+# signed check-in tickets: how long after the event they still scan, and how often revocations are re-read
+app.config["TICKET_VALID_AFTER_END"] = int(os.environ.get("TICKET_VALID_AFTER_END", 3600))
+app.config["TICKET_REVOCATION_REFRESH"] = float(os.environ.get("TICKET_REVOCATION_REFRESH", 5))
+
+# archiving: events that ended this many days ago move to the archive tables, this many per transaction
+app.config["ARCHIVE_AFTER_DAYS"] = int(os.environ.get("ARCHIVE_AFTER_DAYS", 365))
+app.config["ARCHIVE_BATCH_SIZE"] = int(os.environ.get("ARCHIVE_BATCH_SIZE", 200))
+
+# reports page: attendance analytics cover this many days back unless a start date is given
+app.config["ANALYTICS_DEFAULT_DAYS"] = int(os.environ.get("ANALYTICS_DEFAULT_DAYS", 90))
+
+# recurring series: how far ahead occurrences exist, and how often listings top them up
+app.config["SERIES_HORIZON_DAYS"] = int(os.environ.get("SERIES_HORIZON_DAYS", 60))
+app.config["SERIES_CHECK_INTERVAL"] = int(os.environ.get("SERIES_CHECK_INTERVAL", 300))
+
 # Setup Flask-Login
 login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'
 login_manager.login_message = 'Please log in to access this page.'
 
+def _load_user_snapshot(user_id):
+    from models import User
+    return User.identity_snapshot(user_id)
+
+def _load_user_row(user_id):
+    from models import User
+    return db.session.get(User, user_id)
+
+user_cache = UserCache(make_backend(app.config["REPORT_CACHE_URL"], app.config["USER_CACHE_MAX_ENTRIES"]),
+                       _load_user_snapshot, _load_user_row, ttl=app.config["USER_CACHE_TTL"])
+
 @login_manager.user_loader
 def load_user(user_id):
-    from models import User
-    return User.query.get(int(user_id))
+    return user_cache.load(int(user_id))
 
 with app.app_context():
     # Import models and routes
     import models
     import routes
+    import query_plans
+    import seed
+    import benchmark
+    import roster
+    import series
+    import upcoming
+    import tickets
+    import archive
+    import analytics
     
     # Create all tables
     db.create_all()
     
+    # create_all only builds indexes with new tables, so add any missing ones
+    # (IF NOT EXISTS, since every worker runs this at once on startup)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+    
+    from models import College, User, EventStats, StudentActivity, FeedbackSummary
+    
+    # Full-text index over event title/description/venue (SQLite FTS5)
+    from search import init_event_search
+    init_event_search()
+    
+    # Seed counter rows for events and students that predate the rollup tables
+    EventStats.backfill()
+    StudentActivity.backfill()
+    FeedbackSummary.backfill()
+    
     # Create default admin user if none exists
-    from models import College, User
     from werkzeug.security import generate_password_hash
     
     if not College.query.first():
@@ -66,7 +162,7 @@ with app.app_context():
         admin_user = User(
             username="admin",
             email="admin@demo.edu",
-            password_hash=generate_password_hash("admin123"),
+            password_hash=generate_password_hash("admin123", app.config["PASSWORD_HASH_METHOD"]),
             full_name="System Administrator",
             role="admin",
             college_id=default_college.id
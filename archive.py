@@ -0,0 +1,195 @@
+import logging
+from datetime import datetime, timedelta
+import click
+from sqlalchemy import text
+from sqlalchemy.schema import CreateTable
+from app import app, db, report_cache
+from models import (CheckIn, CheckInArchive, Event, EventArchive, EventStats, Feedback, FeedbackArchive,
+                    FeedbackSummary, Registration, RegistrationArchive, SeriesOccurrence, TicketRevocation)
+from search import init_event_search
+from upcoming import upcoming_index
+
+logger = logging.getLogger(__name__)
+
+# Hot table -> cold table for the rows that follow their event into the archive
+CHILD_TABLES = [(Registration, RegistrationArchive), (CheckIn, CheckInArchive), (Feedback, FeedbackArchive)]
+
+# Every hot table whose rows move to an archive table with their ids
+ARCHIVED_TABLES = [(Event, EventArchive)] + CHILD_TABLES
+
+def _rebuild_with_autoincrement(conn, hot, cold):
+    """Recreate ``hot`` from its AUTOINCREMENT definition, keeping its rows, ids and indexes.
+
+    The new table's sequence starts above the highest id in either table.
+    """
+    table = hot.__table__
+    quote = conn.dialect.identifier_preparer.quote
+    name, staging = quote(table.name), quote(f'{table.name}_rebuild')
+    columns = ', '.join(quote(column.name) for column in table.columns)
+
+    create = str(CreateTable(table).compile(dialect=conn.dialect))
+    conn.execute(text(f'DROP TABLE IF EXISTS {staging}'))
+    conn.execute(text(create.replace(f'CREATE TABLE {name} (', f'CREATE TABLE {staging} (', 1)))
+    conn.execute(text(f'INSERT INTO {staging} ({columns}) SELECT {columns} FROM {name}'))
+    conn.execute(text(f'DROP TABLE {name}'))
+    conn.execute(text(f'ALTER TABLE {staging} RENAME TO {name}'))
+    for index in table.indexes:
+        index.create(conn)
+
+    floor = conn.execute(db.select(db.func.max(cold.id))).scalar()
+    if floor is not None:
+        seq = conn.execute(text('SELECT seq FROM sqlite_sequence WHERE name = :name'),
+                           {"name": table.name}).scalar()
+        if seq is None:
+            conn.execute(text('INSERT INTO sqlite_sequence (name, seq) VALUES (:name, :seq)'),
+                         {"name": table.name, "seq": floor})
+        elif seq < floor:
+            conn.execute(text('UPDATE sqlite_sequence SET seq = :seq WHERE name = :name'),
+                         {"name": table.name, "seq": floor})
+    logger.info('Rebuilt %s with AUTOINCREMENT so archived ids are not reused', table.name)
+
+def _tables_reusing_ids(conn):
+    """The (hot, cold) pairs whose SQLite hot table was created without AUTOINCREMENT."""
+    legacy = []
+    for hot, cold in ARCHIVED_TABLES:
+        ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                           {"name": hot.__tablename__}).scalar()
+        if ddl is not None and 'AUTOINCREMENT' not in ddl.upper():
+            legacy.append((hot, cold))
+    return legacy
+
+def tables_reusing_ids():
+    """Names of the hot tables that would hand an archived id out again; always empty off SQLite."""
+    if db.engine.dialect.name != 'sqlite':
+        return []
+    with db.engine.connect() as conn:
+        return [hot.__tablename__ for hot, _ in _tables_reusing_ids(conn)]
+
+def protect_archived_ids():
+    """Upgrade SQLite hot tables created before they were declared AUTOINCREMENT.
+
+    Without it SQLite hands the highest id out again once that row is
+    deleted, as archiving does, and the archive's primary keys would then
+    collide. A one-off migration (``flask upgrade-archive-ids``): the check
+    and the rebuilds share one BEGIN IMMEDIATE transaction, so a concurrent
+    run waits for the write lock and then finds nothing left to do. Other
+    databases' sequences never reuse ids. Returns the rebuilt table names.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return []
+    # Autocommit at the driver, so the explicit BEGIN IMMEDIATE is the only transaction
+    with db.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+        try:
+            legacy = _tables_reusing_ids(conn)
+            for hot, cold in legacy:
+                _rebuild_with_autoincrement(conn, hot, cold)
+            if any(hot is Event for hot, _ in legacy):
+                # Dropping the old event table dropped its search triggers
+                init_event_search(conn)
+            conn.exec_driver_sql('COMMIT')
+        except BaseException:
+            conn.exec_driver_sql('ROLLBACK')
+            raise
+    return [hot.__tablename__ for hot, _ in legacy]
+
+def archived_through():
+    """End time of the newest archived event, or None while the archive is empty (one indexed lookup)."""
+    return db.session.query(db.func.max(EventArchive.end_time)).scalar()
+
+def reaches_archive(start):
+    """Whether a range starting at ``start`` (None = unbounded) can include archived rows."""
+    through = archived_through()
+    return through is not None and (start is None or start <= through)
+
+def _copy_children(hot, cold, event_ids):
+    columns = [column.name for column in cold.__table__.columns]
+    db.session.execute(
+        db.insert(cold).from_select(
+            columns,
+            db.select(*[hot.__table__.c[name] for name in columns]).where(hot.event_id.in_(event_ids))
+        )
+    )
+
+def _archive_batch(event_ids, now):
+    """Move one batch of events and everything hanging off them; the caller commits."""
+    event_columns = [column.name for column in Event.__table__.columns]
+    db.session.execute(
+        db.insert(EventArchive).from_select(
+            event_columns + ['confirmed_count', 'check_in_count', 'feedback_count', 'rating_sum', 'archived_at'],
+            db.select(
+                *[Event.__table__.c[name] for name in event_columns],
+                db.func.coalesce(EventStats.confirmed_count, 0),
+                db.func.coalesce(EventStats.check_in_count, 0),
+                db.func.coalesce(FeedbackSummary.feedback_count, 0),
+                db.func.coalesce(FeedbackSummary.rating_sum, 0),
+                db.literal(now)
+            ).outerjoin(EventStats, EventStats.event_id == Event.id)
+             .outerjoin(FeedbackSummary, FeedbackSummary.event_id == Event.id)
+             .where(Event.id.in_(event_ids))
+        )
+    )
+    for hot, cold in CHILD_TABLES:
+        _copy_children(hot, cold, event_ids)
+
+    # Children first; deleting the event rows also drops them from the search index (event_fts_ad)
+    registration_ids = db.select(Registration.id).where(Registration.event_id.in_(event_ids))
+    db.session.execute(db.delete(TicketRevocation).where(TicketRevocation.registration_id.in_(registration_ids)))
+    db.session.execute(db.delete(SeriesOccurrence).where(SeriesOccurrence.event_id.in_(event_ids)))
+    for hot, _ in CHILD_TABLES:
+        db.session.execute(db.delete(hot).where(hot.event_id.in_(event_ids)))
+    db.session.execute(db.delete(EventStats).where(EventStats.event_id.in_(event_ids)))
+    db.session.execute(db.delete(FeedbackSummary).where(FeedbackSummary.event_id.in_(event_ids)))
+    db.session.execute(db.delete(Event).where(Event.id.in_(event_ids)))
+
+def archive_events(older_than_days=None, batch_size=None):
+    """Move events that ended more than ``older_than_days`` ago into the archive tables.
+
+    Each batch of events, with their registrations, check-ins and feedback,
+    is copied with INSERT ... SELECT and deleted from the hot tables in one
+    transaction, so a batch is either fully hot or fully archived. Counters
+    from event_stats and feedback_summary travel on the archived event row;
+    per-student totals in student_activity are all-time and stay as they are.
+    Returns the number of events archived.
+    """
+    if older_than_days is None:
+        older_than_days = app.config['ARCHIVE_AFTER_DAYS']
+    if batch_size is None:
+        batch_size = app.config['ARCHIVE_BATCH_SIZE']
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+
+    archived = 0
+    while True:
+        batch = db.session.query(Event.id, Event.college_id)\
+                          .filter(Event.end_time < cutoff)\
+                          .order_by(Event.id).limit(batch_size).all()
+        if not batch:
+            break
+        event_ids = [event_id for event_id, _ in batch]
+        _archive_batch(event_ids, datetime.utcnow())
+        db.session.commit()
+
+        college_ids = {college_id for _, college_id in batch}
+        report_cache.invalidate(*college_ids)
+        upcoming_index.invalidate(*college_ids)
+        archived += len(event_ids)
+        logger.info('Archived %d events (%d so far)', len(event_ids), archived)
+    return archived
+
+@app.cli.command('archive-events')
+@click.option('--older-than', 'older_than_days', type=int, default=None,
+              help='Archive events that ended this many days ago (default ARCHIVE_AFTER_DAYS).')
+@click.option('--batch-size', type=int, default=None, help='Events moved per transaction.')
+def archive_events_command(older_than_days, batch_size):
+    """Move finished events and their registrations, check-ins and feedback to the archive tables."""
+    legacy = tables_reusing_ids()
+    if legacy:
+        raise click.ClickException(f'{", ".join(legacy)} would reuse archived ids; '
+                                   'run "flask upgrade-archive-ids" first')
+    click.echo(f'{archive_events(older_than_days, batch_size)} events archived')
+
+@app.cli.command('upgrade-archive-ids')
+def upgrade_archive_ids_command():
+    """One-off: rebuild SQLite hot tables created without AUTOINCREMENT so archived ids are never reused."""
+    rebuilt = protect_archived_ids()
+    click.echo(f'Rebuilt {", ".join(rebuilt)}' if rebuilt else 'Every archived table already keeps its ids')
@@ -0,0 +1,328 @@
+import json
+import re
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+import click
+from app import app, db
+from werkzeug.security import generate_password_hash
+from models import College, User, Event, Registration, CheckIn
+from analytics import DIMENSIONS, attendance_analytics, np, sql_breakdowns
+from archive import archived_through
+from seed import SEED_PASSWORD
+from search import fts_enabled, like_search, search_events
+
+_SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def _logged_in_client(username):
+    client = app.test_client()
+    response = client.post('/login', data={'username': username, 'password': SEED_PASSWORD})
+    if response.status_code != 302:
+        raise click.ClickException(f'Could not log in as {username}; was the database seeded with seed-campus?')
+    return client
+
+class Scenario:
+    """A named route to exercise; ``make_request(client, i)`` issues the i-th request."""
+
+    def __init__(self, name, make_request, role='student'):
+        self.name = name
+        self.make_request = make_request
+        self.role = role
+
+def build_scenarios(college_id, requests, register_capacity=None):
+    """Pick a seeded college's data and describe each route scenario against it."""
+    admin = User.query.filter_by(college_id=college_id, role='admin').first()
+    students = [u.username for u in User.query.filter_by(college_id=college_id, role='student')
+                                              .order_by(User.id).limit(max(requests, 1)).all()]
+    if not admin or not students:
+        raise click.ClickException(f'College {college_id} has no seeded admin/students')
+
+    now = datetime.utcnow()
+    busy_event = db.session.query(Registration.event_id)\
+                           .join(Event, Event.id == Registration.event_id)\
+                           .filter(Event.college_id == college_id)\
+                           .group_by(Registration.event_id)\
+                           .order_by(db.func.count(Registration.id).desc()).first()
+    busy_event_id = busy_event[0] if busy_event else None
+
+    # Write scenarios need fresh work items so every request really writes
+    open_event = Event(title='Benchmark registration target', event_type='workshop',
+                       start_time=now + timedelta(days=365), end_time=now + timedelta(days=365, hours=2),
+                       college_id=college_id, created_by=admin.id, max_participants=register_capacity)
+    db.session.add(open_event)
+    db.session.commit()
+    register_target = open_event.id
+
+    pending_checkins = db.session.query(Registration.user_id, Registration.event_id)\
+                                 .join(Event, Event.id == Registration.event_id)\
+                                 .outerjoin(CheckIn, (CheckIn.user_id == Registration.user_id) &
+                                                     (CheckIn.event_id == Registration.event_id))\
+                                 .filter(Event.college_id == college_id,
+                                         Registration.status == 'confirmed',
+                                         CheckIn.id.is_(None))\
+                                 .limit(requests).all()
+
+    def check_in(client, i):
+        if i >= len(pending_checkins):
+            return None
+        user_id, event_id = pending_checkins[i]
+        return client.post('/checkin', json={'user_id': user_id, 'event_id': event_id})
+
+    return admin.username, students, register_target, [
+        Scenario('browse_events', lambda c, i: c.get('/student/events')),
+        Scenario('student_dashboard', lambda c, i: c.get('/student/dashboard')),
+        Scenario('admin_dashboard', lambda c, i: c.get('/admin/dashboard'), role='admin'),
+        Scenario('reports', lambda c, i: c.get('/admin/reports'), role='admin'),
+        Scenario('report_top_students', lambda c, i: c.get(f'/report/top_students?college_id={college_id}')),
+        Scenario('report_analytics', lambda c, i: c.get('/report/analytics'), role='admin'),
+        Scenario('report_registrations', lambda c, i: c.get(f'/report/registrations?event_id={busy_event_id}'),
+                 role='admin'),
+        Scenario('report_attendance', lambda c, i: c.get(f'/report/attendance/{busy_event_id}')),
+        Scenario('register_event', lambda c, i: c.post(f'/register_event/{register_target}'),
+                 role='per-request-student'),
+        Scenario('checkin', check_in),
+    ]
+
+def run_scenario(scenario, clients, requests, concurrency):
+    """Fire ``requests`` calls across ``concurrency`` threads; return latency/throughput/query stats."""
+    latencies = []
+    query_counts = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker(thread_index):
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            client = clients(i, thread_index)
+            started = time.perf_counter()
+            response = scenario.make_request(client, i)
+            elapsed = time.perf_counter() - started
+            if response is None:
+                continue
+            match = _SERVER_TIMING_QUERIES.search(response.headers.get('Server-Timing', ''))
+            with lock:
+                latencies.append(elapsed)
+                if match:
+                    query_counts.append(int(match.group(1)))
+                if response.status_code >= 400:
+                    errors.append(response.status_code)
+
+    threads = [threading.Thread(target=worker, args=(t,)) for t in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p90_ms": round(_percentile(latencies, 90) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+        "mean_queries": round(statistics.mean(query_counts), 1) if query_counts else None,
+    }
+
+@app.cli.command('benchmark')
+@click.option('--college-id', type=int, default=None, help='Seeded college to target (default: the largest).')
+@click.option('--requests', default=200, show_default=True, help='Requests per scenario.')
+@click.option('--concurrency', default=1, show_default=True, help='Parallel client threads.')
+@click.option('--only', multiple=True, help='Run only the named scenario(s).')
+@click.option('--register-capacity', type=int, default=None,
+              help='Seat limit for the register_event target, to check capacity under concurrency.')
+@click.option('--output', type=click.Path(), help='Write results as JSON for later comparison.')
+@click.option('--compare', type=click.Path(exists=True), help='Earlier --output file to diff against.')
+def benchmark_command(college_id, requests, concurrency, only, register_capacity, output, compare):
+    """Drive key routes through the test client and report latency, throughput and query counts."""
+    if college_id is None:
+        row = db.session.query(User.college_id).filter(User.role == 'student')\
+                        .group_by(User.college_id).order_by(db.func.count(User.id).desc()).first()
+        if row is None:
+            raise click.ClickException('No students found; run "flask seed-campus" first')
+        college_id = row[0]
+
+    admin_name, student_names, register_target, scenarios = build_scenarios(college_id, requests,
+                                                                             register_capacity)
+    admin_clients = [_logged_in_client(admin_name) for _ in range(concurrency)]
+    student_clients = [_logged_in_client(student_names[t % len(student_names)]) for t in range(concurrency)]
+    per_request_clients = {}
+
+    def clients_for(scenario):
+        if scenario.role == 'admin':
+            return lambda i, t: admin_clients[t]
+        if scenario.role == 'per-request-student':
+            # Each registration must come from a different student
+            def pick(i, t):
+                if i not in per_request_clients:
+                    per_request_clients[i] = _logged_in_client(student_names[i % len(student_names)])
+                return per_request_clients[i]
+            return pick
+        return lambda i, t: student_clients[t]
+
+    # Log in the per-request students up front so login time stays out of the numbers
+    if not only or 'register_event' in only:
+        for i in range(min(requests, len(student_names))):
+            per_request_clients[i] = _logged_in_client(student_names[i])
+
+    results = {}
+    for scenario in scenarios:
+        if only and scenario.name not in only:
+            continue
+        results[scenario.name] = run_scenario(scenario, clients_for(scenario), requests, concurrency)
+
+    baseline = {}
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f).get('results', {})
+
+    click.echo(f"{'scenario':<22}{'reqs':>6}{'err':>5}{'rps':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'queries':>9}")
+    for name, r in results.items():
+        line = (f"{name:<22}{r['requests']:>6}{r['errors']:>5}{r['throughput_rps']:>9}"
+                f"{r['p50_ms']:>9}{r['p90_ms']:>9}{r['p99_ms']:>9}{str(r['mean_queries']):>9}")
+        before = baseline.get(name)
+        if before and before.get('p50_ms'):
+            change = (r['p50_ms'] - before['p50_ms']) / before['p50_ms'] * 100
+            line += f"   p50 {change:+.0f}% vs baseline"
+        click.echo(line)
+
+    if 'register_event' in results:
+        statuses = dict(db.session.query(Registration.status, db.func.count(Registration.id))
+                                  .filter(Registration.event_id == register_target)
+                                  .group_by(Registration.status).all())
+        confirmed = statuses.get('confirmed', 0)
+        click.echo(f"register_event: {confirmed} confirmed, {statuses.get('waitlist', 0)} waitlisted"
+                   + (f", capacity {register_capacity}" if register_capacity else ''))
+        if register_capacity and confirmed > register_capacity:
+            raise click.ClickException('register_event oversubscribed the target event')
+
+    if output:
+        with open(output, 'w') as f:
+            json.dump({"college_id": college_id, "requests": requests, "concurrency": concurrency,
+                       "results": results}, f, indent=2)
+
+@app.cli.command('benchmark-login')
+@click.option('--method', 'methods', multiple=True,
+              default=['scrypt:32768:8:1', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000', 'pbkdf2:sha256:100000'],
+              show_default=True, help='Hash method/cost to measure (repeatable).')
+@click.option('--logins', default=40, show_default=True, help='Logins per method.')
+@click.option('--concurrency', default=4, show_default=True, help='Parallel client threads.')
+def benchmark_login_command(methods, logins, concurrency):
+    """Measure /login throughput through the hashing pool at different hash costs."""
+    college = College.query.first()
+    if college is None:
+        raise click.ClickException('No college found; start the app once to create the default one')
+
+    user = User.query.filter_by(username='bench_login_user').first()
+    if user is None:
+        user = User(username='bench_login_user', email='bench_login_user@example.invalid',
+                    password_hash='', full_name='Login Benchmark', role='student', college_id=college.id)
+        db.session.add(user)
+
+    original_method = app.config['PASSWORD_HASH_METHOD']
+    click.echo(f"{'method':<26}{'logins':>8}{'err':>5}{'rps':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}")
+    try:
+        for method in methods:
+            # Matching the configured method keeps rehash-on-login out of the measurement
+            app.config['PASSWORD_HASH_METHOD'] = method
+            user.password_hash = generate_password_hash(SEED_PASSWORD, method)
+            db.session.commit()
+
+            def login(client, i):
+                return client.post('/login', data={'username': 'bench_login_user', 'password': SEED_PASSWORD})
+
+            r = run_scenario(Scenario('login', login), lambda i, t: app.test_client(), logins, concurrency)
+            click.echo(f"{method:<26}{r['requests']:>8}{r['errors']:>5}{r['throughput_rps']:>9}"
+                       f"{r['p50_ms']:>9}{r['p90_ms']:>9}{r['p99_ms']:>9}")
+    finally:
+        app.config['PASSWORD_HASH_METHOD'] = original_method
+
+@app.cli.command('benchmark-search')
+@click.option('--term', 'terms', multiple=True,
+              default=['machine', 'cloud workshop', 'data sci', 'robotics 777', '4242', 'quantum'],
+              show_default=True, help='Search text to time (repeatable).')
+@click.option('--repeat', default=20, show_default=True, help='Runs per term and method.')
+def benchmark_search_command(terms, repeat):
+    """Time FTS5 event search against LIKE '%term%' on the biggest college's events.
+
+    Seed a large event table first, e.g. ``flask seed-campus --events 200000 --registrations 0``.
+    """
+    if not fts_enabled():
+        raise click.ClickException('FTS5 search is only available on SQLite')
+    row = db.session.query(Event.college_id, db.func.count(Event.id))\
+                    .group_by(Event.college_id).order_by(db.func.count(Event.id).desc()).first()
+    if row is None:
+        raise click.ClickException('No events found; run "flask seed-campus" first')
+    college_id, event_count = row
+    click.echo(f"college {college_id}: {event_count:,} events")
+
+    def scoped():
+        return Event.query.filter(Event.college_id == college_id, Event.is_active == True)
+
+    click.echo(f"{'term':<18}{'method':<7}{'hits':>6}{'p50 ms':>9}{'p90 ms':>9}")
+    for term in terms:
+        for method, search in (('fts', search_events), ('like', like_search)):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                hits = len(search(scoped(), term))
+                timings.append(time.perf_counter() - started)
+                db.session.expunge_all()
+            timings.sort()
+            click.echo(f"{term:<18}{method:<7}{hits:>6}"
+                       f"{_percentile(timings, 50) * 1000:>9.2f}{_percentile(timings, 90) * 1000:>9.2f}")
+
+@app.cli.command('benchmark-analytics')
+@click.option('--college-id', type=int, default=None, help='Seeded college to target (default: the busiest).')
+@click.option('--repeat', default=10, show_default=True, help='Runs per method.')
+def benchmark_analytics_command(college_id, repeat):
+    """Time the columnar attendance analytics against per-dimension SQL GROUP BY queries.
+
+    Both sides compute the department, year-of-study and event-type
+    breakdowns (the engine also does weeks, trends and the feedback
+    correlation in the same pass) and their results are compared.
+    """
+    if college_id is None:
+        row = db.session.query(Event.college_id).join(Registration, Registration.event_id == Event.id)\
+                        .group_by(Event.college_id).order_by(db.func.count(Registration.id).desc()).first()
+        if row is None:
+            raise click.ClickException('No registrations found; run "flask seed-campus" first')
+        college_id = row[0]
+
+    # The SQL side reads the hot tables only, so keep the engine out of the archive as well
+    through = archived_through()
+    start = through + timedelta(seconds=1) if through else None
+    now = datetime.utcnow()
+
+    methods = (('columnar', lambda: attendance_analytics(college_id, start, now=now)),
+               ('sql', lambda: sql_breakdowns(college_id, start, now=now)))
+    click.echo(f"college {college_id}, numpy {'on' if np is not None else 'off'}")
+    click.echo(f"{'method':<10}{'p50 ms':>9}{'p90 ms':>9}")
+    results = {}
+    for method, compute in methods:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            results[method] = compute()
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        click.echo(f"{method:<10}{_percentile(timings, 50) * 1000:>9.2f}{_percentile(timings, 90) * 1000:>9.2f}")
+
+    summary = results['columnar']['summary']
+    click.echo(f"{summary['events']} finished events, {summary['confirmed']} confirmed registrations")
+    for dimension in DIMENSIONS:
+        if dimension in results['sql'] and results['sql'][dimension] != results['columnar']['breakdowns'][dimension]:
+            raise click.ClickException(f'{dimension} breakdown differs between the engine and SQL')
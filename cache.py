@@ -0,0 +1,184 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from flask_login import UserMixin
+
+class MemoryBackend:
+    """Size-bounded LRU store with per-entry TTL, local to one worker process."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    # Counters live outside the LRU so evicting one can never resurrect stale entries
+    def get_counter(self, key):
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+class RedisBackend:
+    """Shared store so every worker sees the same entries and invalidations."""
+
+    def __init__(self, url, prefix='campus_events:'):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("The redis package is required for a redis:// cache URL")
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key):
+        raw = self._client.get(self._prefix + key)
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl):
+        self._client.setex(self._prefix + key, int(ttl), pickle.dumps(value))
+
+    def delete(self, key):
+        self._client.delete(self._prefix + key)
+
+    def get_counter(self, key):
+        return int(self._client.get(self._prefix + key) or 0)
+
+    def incr(self, key):
+        return self._client.incr(self._prefix + key)
+
+def make_backend(url, max_entries=512):
+    """memory:// gives a per-worker LRU; redis://... a store shared by all workers."""
+    if url.startswith('redis://') or url.startswith('rediss://'):
+        return RedisBackend(url)
+    return MemoryBackend(max_entries)
+
+class ReportCache:
+    """Caches report fragments per college and drops them whenever that college's data changes.
+
+    Invalidation bumps a per-college generation that is part of every key, so
+    a single counter write retires all of the college's entries at once.
+    """
+
+    def __init__(self, backend, ttl=300):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_url(cls, url, max_entries=512, ttl=300):
+        return cls(make_backend(url, max_entries), ttl=ttl)
+
+    def _key(self, college_id, name, params):
+        generation = self.backend.get_counter(f"gen:{college_id}")
+        param_part = '&'.join(f"{k}={params[k]}" for k in sorted(params))
+        return f"report:{college_id}:{generation}:{name}:{param_part}"
+
+    def get_or_compute(self, college_id, name, compute, **params):
+        key = self._key(college_id, name, params)
+        cached = self.backend.get(key)
+        if cached is not None:
+            with self._lock:
+                self.hits += 1
+            return cached[0]
+
+        with self._lock:
+            self.misses += 1
+        value = compute()
+        # Wrapped so a cached None/empty result is distinguishable from a miss
+        self.backend.set(key, (value,), self.ttl)
+        return value
+
+    def invalidate(self, *college_ids):
+        for college_id in set(college_ids):
+            if college_id is not None:
+                self.backend.incr(f"gen:{college_id}")
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else None
+            }
+
+class CachedUser(UserMixin):
+    """Stands in for a User as ``current_user`` using a cached identity snapshot.
+
+    Snapshot fields (id, role, college_id, is_active, full_name, department,
+    college name) need no query; any other attribute loads the real row once.
+    """
+
+    def __init__(self, snapshot, load_row):
+        self.__dict__.update(snapshot)
+        self.__dict__['college'] = SimpleNamespace(id=snapshot['college_id'], name=snapshot['college_name'])
+        self.__dict__['_load_row'] = load_row
+        self.__dict__['_row'] = None
+
+    @property
+    def is_active(self):
+        return self.__dict__['active']
+
+    def __getattr__(self, name):
+        # Only reached for attributes that are not part of the snapshot
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if self._row is None:
+            self.__dict__['_row'] = self._load_row(self.id)
+        return getattr(self._row, name)
+
+class UserCache:
+    """TTL cache of user identity snapshots for the Flask-Login user loader."""
+
+    def __init__(self, backend, load_snapshot, load_row, ttl=60):
+        self.backend = backend
+        self.load_snapshot = load_snapshot
+        self.load_row = load_row
+        self.ttl = ttl
+
+    def load(self, user_id):
+        key = f"user:{user_id}"
+        snapshot = self.backend.get(key)
+        if snapshot is None:
+            snapshot = self.load_snapshot(user_id)
+            if snapshot is None:
+                return None
+            self.backend.set(key, snapshot, self.ttl)
+        # Deactivated accounts are rejected straight from the cache
+        if not snapshot['active']:
+            return None
+        return CachedUser(snapshot, self.load_row)
+
+    def invalidate(self, *user_ids):
+        for user_id in set(user_ids):
+            self.backend.delete(f"user:{user_id}")
@@ -0,0 +1,37 @@
+from functools import wraps
+from flask import abort, make_response, request
+
+def conditional(validator):
+    """Answer conditional GETs from a cheap change marker before running the view.
+
+    ``validator(**view_args)`` returns ``(tag, version)``, or None when the
+    resource does not exist, which is a 404 before any ETag is compared. The
+    ETag built from tag and version is the only validator: versions move on
+    every write, whereas Last-Modified's one-second resolution could answer
+    304 for a write made in the same second. On a match the view is skipped
+    and a bodiless 304 goes back; otherwise the view runs and its 200 gets
+    the ETag. Clients must revalidate every time, and shared caches may not
+    store the payloads since they carry student details.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            validated = validator(*args, **kwargs)
+            if validated is None:
+                abort(404)
+            tag, version = validated
+            etag = f"{tag}-v{version}"
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
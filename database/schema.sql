@@ -49,6 +49,24 @@ CREATE TABLE event (
     FOREIGN KEY (created_by) REFERENCES user(id) ON DELETE CASCADE
 );
 
+-- Event Stats Table (denormalized counters maintained by the application)
+CREATE TABLE event_stats (
+    event_id INT PRIMARY KEY,
+    confirmed_count INT NOT NULL DEFAULT 0,
+    check_in_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (event_id) REFERENCES event(id) ON DELETE CASCADE
+);
+
+-- Student Activity Table (per-student rollup maintained by the application)
+CREATE TABLE student_activity (
+    user_id INT PRIMARY KEY,
+    college_id INT NOT NULL,
+    registration_count INT NOT NULL DEFAULT 0,
+    check_in_count INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (user_id) REFERENCES user(id) ON DELETE CASCADE,
+    FOREIGN KEY (college_id) REFERENCES college(id) ON DELETE CASCADE
+);
+
 -- Registration Table
 CREATE TABLE registration (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -89,6 +107,140 @@ CREATE TABLE feedback (
 );
 
 
+-- Report Job Table (background report runs and their stored results)
+CREATE TABLE report_job (
+    id VARCHAR(32) PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    college_id INT NOT NULL,
+    params TEXT NOT NULL,
+    params_key VARCHAR(64) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    result LONGTEXT,
+    error TEXT,
+    created_by INT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME,
+    finished_at DATETIME,
+    FOREIGN KEY (college_id) REFERENCES college(id) ON DELETE CASCADE,
+    FOREIGN KEY (created_by) REFERENCES user(id) ON DELETE CASCADE
+);
+
+-- Feedback Summary Table (per-event rating count, sum and histogram)
+CREATE TABLE feedback_summary (
+    event_id INT PRIMARY KEY,
+    feedback_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_1 INT NOT NULL DEFAULT 0,
+    rating_2 INT NOT NULL DEFAULT 0,
+    rating_3 INT NOT NULL DEFAULT 0,
+    rating_4 INT NOT NULL DEFAULT 0,
+    rating_5 INT NOT NULL DEFAULT 0,
+    last_submitted_at DATETIME,
+    FOREIGN KEY (event_id) REFERENCES event(id) ON DELETE CASCADE
+);
+
+-- Data Version Table (change markers behind ETag / Last-Modified on the JSON read endpoints)
+CREATE TABLE data_version (
+    scope VARCHAR(20) NOT NULL,
+    scope_id INT NOT NULL,
+    version INT NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (scope, scope_id)
+);
+
+-- Event Series Table (recurring event template; occurrences are ordinary event rows)
+CREATE TABLE event_series (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    college_id INT NOT NULL,
+    created_by INT NOT NULL,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    event_type VARCHAR(50) NOT NULL,
+    venue VARCHAR(200),
+    max_participants INT,
+    first_start DATETIME NOT NULL,
+    duration_minutes INT NOT NULL,
+    registration_lead_minutes INT,
+    frequency VARCHAR(10) NOT NULL,
+    `interval` INT NOT NULL DEFAULT 1,
+    occurrence_limit INT,
+    until DATETIME,
+    materialized_until DATETIME,
+    is_active BOOLEAN DEFAULT TRUE,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (college_id) REFERENCES college(id) ON DELETE CASCADE,
+    FOREIGN KEY (created_by) REFERENCES user(id) ON DELETE CASCADE
+);
+
+-- Series Occurrence Table (one row per materialized slot; the key prevents duplicates)
+CREATE TABLE series_occurrence (
+    series_id INT NOT NULL,
+    starts_at DATETIME NOT NULL,
+    event_id INT NOT NULL UNIQUE,
+    PRIMARY KEY (series_id, starts_at),
+    FOREIGN KEY (series_id) REFERENCES event_series(id) ON DELETE CASCADE,
+    FOREIGN KEY (event_id) REFERENCES event(id) ON DELETE CASCADE
+);
+
+-- Ticket Revocation Table (cancelled registrations whose signed entry tickets are refused)
+CREATE TABLE ticket_revocation (
+    registration_id INT PRIMARY KEY,
+    event_end DATETIME NOT NULL,
+    revoked_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (registration_id) REFERENCES registration(id) ON DELETE CASCADE
+);
+
+-- Archive Tables (finished events moved out of the hot tables by `flask archive-events`; ids are kept,
+-- so the hot tables must never reuse one: MySQL 8+ persists AUTO_INCREMENT across restarts, 5.7 does not)
+CREATE TABLE event_archive (
+    id INT PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    description TEXT,
+    event_type VARCHAR(50) NOT NULL,
+    venue VARCHAR(200),
+    start_time DATETIME NOT NULL,
+    end_time DATETIME NOT NULL,
+    max_participants INT,
+    registration_deadline DATETIME,
+    college_id INT NOT NULL,
+    created_by INT NOT NULL,
+    created_at DATETIME,
+    is_active BOOLEAN,
+    requires_approval BOOLEAN,
+    confirmed_count INT NOT NULL DEFAULT 0,
+    check_in_count INT NOT NULL DEFAULT 0,
+    feedback_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    archived_at DATETIME NOT NULL
+);
+
+CREATE TABLE registration_archive (
+    id INT PRIMARY KEY,
+    user_id INT NOT NULL,
+    event_id INT NOT NULL,
+    status VARCHAR(20),
+    registered_at DATETIME,
+    notes TEXT
+);
+
+CREATE TABLE check_in_archive (
+    id INT PRIMARY KEY,
+    user_id INT NOT NULL,
+    event_id INT NOT NULL,
+    check_in_time DATETIME,
+    notes TEXT
+);
+
+CREATE TABLE feedback_archive (
+    id INT PRIMARY KEY,
+    rating INT NOT NULL,
+    comment TEXT,
+    created_at DATETIME,
+    user_id INT NOT NULL,
+    event_id INT NOT NULL
+);
+
+
 -- Create Indexes for Performance
 CREATE INDEX idx_user_college ON user(college_id);
 CREATE INDEX idx_user_role ON user(role);
@@ -100,6 +252,24 @@ CREATE INDEX idx_registration_event ON registration(event_id);
 CREATE INDEX idx_registration_status ON registration(status);
 CREATE INDEX idx_checkin_user ON check_in(user_id);
 CREATE INDEX idx_checkin_event ON check_in(event_id);
+CREATE INDEX idx_user_college_role ON user(college_id, role);
+CREATE INDEX idx_event_college_active_start ON event(college_id, is_active, start_time);
+CREATE INDEX idx_event_college_created ON event(college_id, created_at);
+CREATE INDEX idx_event_college_type ON event(college_id, event_type);
+CREATE INDEX idx_registration_user_registered ON registration(user_id, registered_at);
+CREATE INDEX idx_registration_event_status ON registration(event_id, status);
+CREATE INDEX idx_feedback_event ON feedback(event_id);
+CREATE INDEX idx_series_active_materialized ON event_series(is_active, materialized_until);
+CREATE INDEX idx_series_college ON event_series(college_id);
+CREATE INDEX idx_ticket_revocation_revoked ON ticket_revocation(revoked_at);
+CREATE INDEX idx_event_archive_college_start ON event_archive(college_id, start_time);
+CREATE INDEX idx_event_archive_end ON event_archive(end_time);
+CREATE INDEX idx_registration_archive_event ON registration_archive(event_id);
+CREATE INDEX idx_registration_archive_registered ON registration_archive(registered_at);
+CREATE INDEX idx_check_in_archive_event ON check_in_archive(event_id);
+CREATE INDEX idx_feedback_archive_event ON feedback_archive(event_id);
+CREATE INDEX idx_activity_leaderboard ON student_activity(college_id, registration_count, check_in_count);
+CREATE INDEX idx_report_job_params_status ON report_job(params_key, status);
 
 -- Insert Sample Data
 INSERT INTO college (name, code, address) VALUES 
@@ -0,0 +1,73 @@
+import logging
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+class RepeatedQueryError(RuntimeError):
+    """Raised in testing mode when a request repeats one statement shape too often (likely N+1)."""
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = (0.0, None)
+        self.shapes = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.total += duration
+        self.shapes[statement] += 1
+        if duration > self.slowest[0]:
+            self.slowest = (duration, statement)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    if has_request_context() and 'query_stats' in g:
+        # Parameters are bound separately, so the SQL text is the statement shape
+        g.query_stats.record(statement, time.perf_counter() - started)
+
+def init_query_instrumentation(app):
+    """Record query count, DB time and the slowest statement for every request.
+
+    Results go to a ``Server-Timing`` header and a log line. A statement shape
+    repeated more than ``SQL_REPEAT_THRESHOLD`` times in one request is
+    logged as a likely N+1, and raises ``RepeatedQueryError`` when testing.
+    """
+    app.config.setdefault('SQL_REPEAT_THRESHOLD', 20)
+
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.pop('query_stats', None)
+        if stats is None:
+            return response
+
+        total_ms = stats.total * 1000
+        response.headers.add('Server-Timing', f'db;dur={total_ms:.1f};desc="{stats.count} queries"')
+        logger.info('%s %s: %d queries, %.1f ms in DB, slowest %.1f ms: %s',
+                    request.method, request.path, stats.count, total_ms,
+                    stats.slowest[0] * 1000, stats.slowest[1])
+
+        threshold = app.config['SQL_REPEAT_THRESHOLD']
+        repeated = [(shape, n) for shape, n in stats.shapes.items() if n > threshold]
+        for shape, n in repeated:
+            logger.warning('Possible N+1 in %s %s: statement ran %d times: %s',
+                           request.method, request.path, n, shape)
+        if repeated and app.testing:
+            raise RepeatedQueryError(
+                f'{request.method} {request.path} repeated a statement {repeated[0][1]} times'
+            )
+        return response
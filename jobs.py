@@ -0,0 +1,93 @@
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from app import app, db
+from models import ReportJob
+
+logger = logging.getLogger(__name__)
+
+# kind -> function(college_id, **params) returning a JSON-serializable result
+JOB_KINDS = {}
+
+_executor = None
+_enqueue_lock = threading.Lock()
+
+def job_kind(name):
+    """Register a report function that can be run in the background."""
+    def decorator(fn):
+        JOB_KINDS[name] = fn
+        return fn
+    return decorator
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=app.config['REPORT_JOB_WORKERS'],
+                                       thread_name_prefix='report-job')
+    return _executor
+
+def _params_key(kind, college_id, params):
+    canonical = json.dumps({"kind": kind, "college_id": college_id, "params": params}, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+def validate(kind, college_id, params):
+    """Raise ValueError unless ``kind`` exists and accepts ``params``."""
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown report kind '{kind}'")
+    try:
+        inspect.signature(JOB_KINDS[kind]).bind(college_id, **params)
+    except TypeError as e:
+        raise ValueError(str(e))
+
+def enqueue(kind, college_id, params, user_id):
+    """Queue a report, or return the identical one already queued/running.
+
+    Returns ``(job, created)``. Jobs older than REPORT_JOB_TIMEOUT are not
+    joined, so a job orphaned by a worker restart cannot block new ones.
+    """
+    validate(kind, college_id, params)
+    key = _params_key(kind, college_id, params)
+    cutoff = datetime.utcnow() - timedelta(seconds=app.config['REPORT_JOB_TIMEOUT'])
+
+    with _enqueue_lock:
+        job = ReportJob.query.filter(
+            ReportJob.params_key == key,
+            ReportJob.status.in_(['queued', 'running']),
+            ReportJob.created_at >= cutoff
+        ).first()
+        if job:
+            return job, False
+
+        job = ReportJob(id=uuid.uuid4().hex, kind=kind, college_id=college_id,
+                        params=json.dumps(params, sort_keys=True), params_key=key,
+                        status='queued', created_by=user_id)
+        db.session.add(job)
+        db.session.commit()
+
+    _get_executor().submit(_run, job.id)
+    return job, True
+
+def _run(job_id):
+    with app.app_context():
+        job = db.session.get(ReportJob, job_id)
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        db.session.commit()
+
+        try:
+            result = JOB_KINDS[job.kind](job.college_id, **json.loads(job.params))
+            job.result = json.dumps(result, default=str)
+            job.status = 'done'
+        except Exception as e:
+            logger.exception('Report job %s (%s) failed', job_id, job.kind)
+            db.session.rollback()
+            job = db.session.get(ReportJob, job_id)
+            job.status = 'failed'
+            job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
@@ -0,0 +1,183 @@
+import json
+import logging
+import threading
+import time
+from app import app, db
+from models import DataVersion, Event, EventStats
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """One SSE client: the events it watches, whose they are, and the latest unsent message per event.
+
+    Pending updates are keyed by message type and event id, so a slow client
+    only ever gets the newest counts rather than a growing backlog.
+    """
+
+    def __init__(self, event_ids, user_id=None):
+        self.event_ids = frozenset(event_ids)
+        self.user_id = user_id
+        self.closed = False
+        self._pending = {}
+        self._ready = threading.Condition()
+
+    def push(self, payload, kind='counts'):
+        with self._ready:
+            self._pending[(kind, payload['id'])] = (kind, payload)
+            self._ready.notify()
+
+    def wait(self, timeout):
+        """Return pending ``(kind, payload)`` updates, or an empty list if none arrive within ``timeout``."""
+        with self._ready:
+            if not self._pending:
+                self._ready.wait(timeout)
+            updates = list(self._pending.values())
+            self._pending.clear()
+            return updates
+
+# Version markers bumped by every write that changes the live counters
+COUNTER_SCOPES = ('registrations', 'checkins')
+
+class LivePublisher:
+    """Fans event counter changes out to the SSE clients watching those events.
+
+    Write paths call ``notify`` after committing; it only marks the events
+    dirty and wakes the background thread. Writes handled by other worker
+    processes are found through the DataVersion markers they bump in the
+    same transaction: every LIVE_UPDATE_INTERVAL seconds, while anyone is
+    watching, the thread reads the watched events' markers in one query.
+    Fresh counts for every changed event are then read in a single query
+    and pushed to the subscribers of each event.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_event = {}
+        self._dirty = set()
+        self._versions = {}
+        self._wake = threading.Event()
+        self._thread = None
+        self.subscribers = 0
+
+    def _ensure_thread(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='live-publisher', daemon=True)
+            self._thread.start()
+
+    def subscribe(self, event_ids, user_id=None):
+        """Register a client for ``event_ids``; returns None when LIVE_MAX_SUBSCRIBERS is reached."""
+        subscription = Subscription(event_ids, user_id)
+        with self._lock:
+            if self.subscribers >= app.config['LIVE_MAX_SUBSCRIBERS']:
+                return None
+            self.subscribers += 1
+            for event_id in subscription.event_ids:
+                self._by_event.setdefault(event_id, set()).add(subscription)
+            self._ensure_thread()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription.closed:
+                return
+            subscription.closed = True
+            self.subscribers -= 1
+            for event_id in subscription.event_ids:
+                watchers = self._by_event.get(event_id)
+                if watchers is not None:
+                    watchers.discard(subscription)
+                    if not watchers:
+                        del self._by_event[event_id]
+
+    def notify(self, *event_ids):
+        with self._lock:
+            # Events nobody is watching are not worth a query
+            watched = [event_id for event_id in event_ids if event_id in self._by_event]
+            if watched:
+                self._dirty.update(watched)
+                self._wake.set()
+
+    def promoted(self, promotions, titles):
+        """Tell students watching an event that they were moved off its waitlist.
+
+        ``promotions`` maps event ids to promoted user ids; only those users'
+        own connections get the message, and counts follow through ``notify``.
+        """
+        with self._lock:
+            for event_id, user_ids in promotions.items():
+                user_ids = set(user_ids)
+                for subscription in self._by_event.get(event_id, ()):
+                    if subscription.user_id in user_ids:
+                        subscription.push({"id": event_id, "title": titles.get(event_id)}, kind='promoted')
+        self.notify(*promotions)
+
+    def _changed_elsewhere(self, watched):
+        """Watched events whose markers moved since the last poll, including ones not polled before."""
+        versions = {}
+        for scope, event_id, version in db.session.query(DataVersion.scope, DataVersion.scope_id, DataVersion.version)\
+                                                   .filter(DataVersion.scope.in_(COUNTER_SCOPES),
+                                                           DataVersion.scope_id.in_(watched)):
+            versions[(scope, event_id)] = version
+        changed = {event_id for (scope, event_id), version in versions.items()
+                   if self._versions.get((scope, event_id)) != version}
+        self._versions = versions
+        return changed
+
+    def _run(self):
+        while True:
+            interval = app.config['LIVE_UPDATE_INTERVAL']
+            if self._wake.wait(interval):
+                # Coalesce a burst of local writes into one read and one push per client
+                time.sleep(interval)
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                watched = list(self._by_event)
+                self._wake.clear()
+            if not watched:
+                continue
+            try:
+                with app.app_context():
+                    dirty |= self._changed_elsewhere(watched)
+                    payloads = snapshot(dirty)
+            except Exception:
+                logger.exception('Could not read live counters for %d events', len(dirty))
+                continue
+            with self._lock:
+                for payload in payloads:
+                    for subscription in self._by_event.get(payload['id'], ()):
+                        subscription.push(payload)
+
+def snapshot(event_ids):
+    """Current registration, check-in and capacity figures for ``event_ids``, in one query."""
+    if not event_ids:
+        return []
+    rows = db.session.query(Event.id, Event.max_participants,
+                            EventStats.confirmed_count, EventStats.check_in_count)\
+                     .join(EventStats, EventStats.event_id == Event.id)\
+                     .filter(Event.id.in_(event_ids)).all()
+    return [{
+        "id": event_id,
+        "registered": confirmed,
+        "checked_in": checked_in,
+        "capacity": capacity,
+        "full": bool(capacity) and confirmed >= capacity
+    } for event_id, capacity, confirmed, checked_in in rows]
+
+def sse_message(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream(subscription, initial):
+    """SSE body: the initial counts, then pushed updates, with a ping every LIVE_HEARTBEAT seconds."""
+    heartbeat = app.config['LIVE_HEARTBEAT']
+    yield f"retry: {int(heartbeat * 1000)}\n\n"
+    for payload in initial:
+        yield sse_message('counts', payload)
+    while not subscription.closed:
+        updates = subscription.wait(heartbeat)
+        if not updates:
+            # Lets the client refresh time-based badges and the server notice dead connections
+            yield sse_message('ping', {})
+        for kind, payload in updates:
+            yield sse_message(kind, payload)
+
+live_publisher = LivePublisher()
@@ -1,7 +1,10 @@
 from datetime import datetime
-from app import db
+from app import db, user_cache
 from flask_login import UserMixin
-from sqlalchemy import func
+from sqlalchemy import case, func, literal
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, object_session
 
 class College(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -32,6 +35,31 @@ class User(UserMixin, db.Model):
     # Relationships
     registrations = db.relationship('Registration', backref='user', lazy=True)
     check_ins = db.relationship('CheckIn', backref='user', lazy=True)
+    
+    __table_args__ = (db.Index('idx_user_college_role', 'college_id', 'role'),)
+    
+    @classmethod
+    def identity_snapshot(cls, user_id):
+        """The small, cacheable slice of a user that request handling needs."""
+        row = db.session.query(
+            cls.id, cls.role, cls.college_id, cls.is_active.label('active'),
+            cls.full_name, cls.department, College.name.label('college_name')
+        ).join(College, College.id == cls.college_id)\
+         .filter(cls.id == user_id).first()
+        return row._asdict() if row else None
+
+# Drop cached identity snapshots once changes to a user are committed
+@event.listens_for(User, 'after_update')
+def _queue_user_cache_invalidation(mapper, connection, target):
+    object_session(target).info.setdefault('changed_user_ids', set()).add(target.id)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    user_cache.invalidate(*session.info.pop('changed_user_ids', ()))
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_users(session):
+    session.info.pop('changed_user_ids', None)
 
 class Event(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -54,13 +82,31 @@ class Event(db.Model):
     check_ins = db.relationship('CheckIn', backref='event', lazy=True, cascade='all, delete-orphan')
     creator = db.relationship('User', backref='created_events')
     
+    # Composite indexes matching the listing filters and their sort keys
+    __table_args__ = (
+        db.Index('idx_event_college_active_start', 'college_id', 'is_active', 'start_time'),
+        db.Index('idx_event_college_created', 'college_id', 'created_at'),
+        db.Index('idx_event_college_type', 'college_id', 'event_type'),
+        # Archived events keep their ids, so SQLite must never hand one out again
+        {'sqlite_autoincrement': True},
+    )
+    # Counters are joined-loaded so event lists render without per-row COUNT queries
+    stats = db.relationship('EventStats', backref='event', uselist=False, lazy='joined',
+                            cascade='all, delete-orphan')
+    feedback_summary = db.relationship('FeedbackSummary', uselist=False, cascade='all, delete-orphan')
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if self.stats is None:
+            self.stats = EventStats(confirmed_count=0, check_in_count=0)
+    
     @property
     def registration_count(self):
-        return Registration.query.filter_by(event_id=self.id, status='confirmed').count()
+        return self.stats.confirmed_count if self.stats else 0
     
     @property
     def check_in_count(self):
-        return CheckIn.query.filter_by(event_id=self.id).count()
+        return self.stats.check_in_count if self.stats else 0
     
     @property
     def is_registration_open(self):
@@ -68,6 +114,103 @@ class Event(db.Model):
             return self.start_time > datetime.utcnow()
         return self.registration_deadline > datetime.utcnow()
 
+class EventStats(db.Model):
+    """Denormalized per-event counters, kept in step by the register, cancel and check-in paths."""
+    __tablename__ = 'event_stats'
+
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), primary_key=True)
+    confirmed_count = db.Column(db.Integer, nullable=False, default=0)
+    check_in_count = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def increment(cls, event_id, **deltas):
+        """Adjust counters in SQL (e.g. ``confirmed_count=-1``) so concurrent writers don't lose updates."""
+        values = {name: getattr(cls, name) + delta for name, delta in deltas.items()}
+        return db.session.execute(
+            db.update(cls).where(cls.event_id == event_id).values(**values)
+        )
+
+    @classmethod
+    def reserve_seat(cls, event_id, capacity=None):
+        """Take one confirmed seat in a single conditional UPDATE; False means the event is full."""
+        stmt = db.update(cls).where(cls.event_id == event_id)
+        if capacity:
+            stmt = stmt.where(cls.confirmed_count < capacity)
+        result = db.session.execute(stmt.values(confirmed_count=cls.confirmed_count + 1))
+        return result.rowcount == 1
+
+    @classmethod
+    def backfill(cls):
+        """Create counter rows for events that predate this table (or were bulk inserted)."""
+        confirmed = db.select(func.count(Registration.id))\
+                      .where(Registration.event_id == Event.id, Registration.status == 'confirmed')\
+                      .scalar_subquery()
+        check_ins = db.select(func.count(CheckIn.id))\
+                      .where(CheckIn.event_id == Event.id)\
+                      .scalar_subquery()
+        missing = db.select(Event.id, confirmed, check_ins)\
+                    .outerjoin(cls, cls.event_id == Event.id)\
+                    .where(cls.event_id.is_(None))
+        db.session.execute(
+            db.insert(cls).from_select(['event_id', 'confirmed_count', 'check_in_count'], missing)
+        )
+        db.session.commit()
+
+class StudentActivity(db.Model):
+    """Per-student registration and check-in totals backing the top-students leaderboards."""
+    __tablename__ = 'student_activity'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    college_id = db.Column(db.Integer, db.ForeignKey('college.id'), nullable=False)
+    registration_count = db.Column(db.Integer, nullable=False, default=0)  # excludes cancelled
+    check_in_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('idx_activity_leaderboard', 'college_id', 'registration_count', 'check_in_count'),
+    )
+
+    @classmethod
+    def increment(cls, user_id, **deltas):
+        """Adjust a student's totals in SQL, creating the row on their first activity."""
+        values = {name: getattr(cls, name) + delta for name, delta in deltas.items()}
+        update = db.update(cls).where(cls.user_id == user_id).values(**values)
+        if db.session.execute(update).rowcount:
+            return
+
+        seed = db.select(
+            User.id,
+            User.college_id,
+            literal(deltas.get('registration_count', 0)),
+            literal(deltas.get('check_in_count', 0))
+        ).where(User.id == user_id)
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(cls).from_select(
+                    ['user_id', 'college_id', 'registration_count', 'check_in_count'], seed
+                ))
+        except IntegrityError:
+            # A concurrent request created the row first
+            db.session.execute(update)
+
+    @classmethod
+    def backfill(cls):
+        """Create rollup rows for students whose activity predates this table."""
+        registrations = db.select(func.count(Registration.id))\
+                          .where(Registration.user_id == User.id, Registration.status != 'cancelled')\
+                          .scalar_subquery()
+        check_ins = db.select(func.count(CheckIn.id))\
+                      .where(CheckIn.user_id == User.id)\
+                      .scalar_subquery()
+        missing = db.select(User.id, User.college_id, registrations, check_ins)\
+                    .outerjoin(cls, cls.user_id == User.id)\
+                    .where(User.role == 'student', cls.user_id.is_(None))
+        db.session.execute(
+            db.insert(cls).from_select(
+                ['user_id', 'college_id', 'registration_count', 'check_in_count'], missing
+            )
+        )
+        db.session.commit()
+
 class Registration(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -77,7 +220,12 @@ class Registration(db.Model):
     notes = db.Column(db.Text)
     
     # Unique constraint to prevent duplicate registrations
-    __table_args__ = (db.UniqueConstraint('user_id', 'event_id', name='unique_user_event_registration'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'event_id', name='unique_user_event_registration'),
+        db.Index('idx_registration_user_registered', 'user_id', 'registered_at'),
+        db.Index('idx_registration_event_status', 'event_id', 'status'),
+        {'sqlite_autoincrement': True},
+    )
 
 class CheckIn(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -87,7 +235,11 @@ class CheckIn(db.Model):
     notes = db.Column(db.Text)
     
     # Unique constraint to prevent duplicate check-ins
-    __table_args__ = (db.UniqueConstraint('user_id', 'event_id', name='unique_user_event_checkin'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'event_id', name='unique_user_event_checkin'),
+        db.Index('idx_checkin_event', 'event_id'),
+        {'sqlite_autoincrement': True},
+    )
 
 #New Feedback model
 class Feedback(db.Model):
@@ -104,4 +256,267 @@ class Feedback(db.Model):
     user = db.relationship('User', backref='feedbacks')
     event = db.relationship('Event', backref='feedbacks')
 
-    __table_args__ = (db.UniqueConstraint('user_id', 'event_id', name='unique_user_event_feedback'),)
\ No newline at end of file
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'event_id', name='unique_user_event_feedback'),
+        db.Index('idx_feedback_event', 'event_id'),
+        {'sqlite_autoincrement': True},
+    )
+
+class FeedbackSummary(db.Model):
+    """Per-event rating count, sum and 1-5 histogram, updated with each feedback submission."""
+    __tablename__ = 'feedback_summary'
+
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), primary_key=True)
+    feedback_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    rating_1 = db.Column(db.Integer, nullable=False, default=0)
+    rating_2 = db.Column(db.Integer, nullable=False, default=0)
+    rating_3 = db.Column(db.Integer, nullable=False, default=0)
+    rating_4 = db.Column(db.Integer, nullable=False, default=0)
+    rating_5 = db.Column(db.Integer, nullable=False, default=0)
+    last_submitted_at = db.Column(db.DateTime)
+
+    RATINGS = range(1, 6)
+
+    @property
+    def average_rating(self):
+        return round(self.rating_sum / self.feedback_count, 2) if self.feedback_count else None
+
+    @property
+    def histogram(self):
+        return {rating: getattr(self, f'rating_{rating}') for rating in self.RATINGS}
+
+    @classmethod
+    def record(cls, event_id, rating, submitted_at):
+        """Add one rating in SQL, creating the event's row on its first feedback."""
+        bucket = f'rating_{rating}'
+        update = db.update(cls).where(cls.event_id == event_id).values({
+            cls.feedback_count: cls.feedback_count + 1,
+            cls.rating_sum: cls.rating_sum + rating,
+            getattr(cls, bucket): getattr(cls, bucket) + 1,
+            cls.last_submitted_at: submitted_at,
+        })
+        if db.session.execute(update).rowcount:
+            return
+
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(cls).values({
+                    'event_id': event_id, 'feedback_count': 1, 'rating_sum': rating,
+                    bucket: 1, 'last_submitted_at': submitted_at
+                }))
+        except IntegrityError:
+            # A concurrent request created the row first
+            db.session.execute(update)
+
+    @classmethod
+    def backfill(cls):
+        """Create summary rows for events whose feedback predates this table (or was bulk inserted)."""
+        buckets = [func.sum(case((Feedback.rating == rating, 1), else_=0)) for rating in cls.RATINGS]
+        missing = db.select(Feedback.event_id, func.count(Feedback.id), func.sum(Feedback.rating),
+                            *buckets, func.max(Feedback.created_at))\
+                    .outerjoin(cls, cls.event_id == Feedback.event_id)\
+                    .where(cls.event_id.is_(None))\
+                    .group_by(Feedback.event_id)
+        db.session.execute(db.insert(cls).from_select(
+            ['event_id', 'feedback_count', 'rating_sum',
+             *[f'rating_{rating}' for rating in cls.RATINGS], 'last_submitted_at'],
+            missing
+        ))
+        db.session.commit()
+
+class ReportJob(db.Model):
+    """A report computed in the background; the JSON result is kept for later download."""
+    __tablename__ = 'report_job'
+
+    id = db.Column(db.String(32), primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # key into jobs.JOB_KINDS
+    college_id = db.Column(db.Integer, db.ForeignKey('college.id'), nullable=False)
+    params = db.Column(db.Text, nullable=False, default='{}')  # JSON
+    params_key = db.Column(db.String(64), nullable=False)  # hash of kind + college + params, for coalescing
+    status = db.Column(db.String(20), nullable=False, default='queued')  # 'queued', 'running', 'done', 'failed'
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (db.Index('idx_report_job_params_status', 'params_key', 'status'),)
+
+class DataVersion(db.Model):
+    """Change markers behind the ETag validators of the JSON read endpoints.
+
+    ``scope`` names what changed ('registrations', 'checkins', 'feedback' per
+    event id; 'students' per college id). Writers bump the marker in the same
+    transaction as the data, so every worker sees it move together.
+    """
+    __tablename__ = 'data_version'
+
+    scope = db.Column(db.String(20), primary_key=True)
+    scope_id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    @classmethod
+    def bump(cls, scope, *scope_ids):
+        """Advance the markers: one UPDATE for those that exist, one INSERT for the rest."""
+        scope_ids = set(scope_ids)
+        if not scope_ids:
+            return
+        now = datetime.utcnow()
+        update = db.update(cls).where(cls.scope == scope, cls.scope_id.in_(scope_ids))\
+                   .values(version=cls.version + 1, updated_at=now)\
+                   .returning(cls.scope_id)\
+                   .execution_options(synchronize_session=False)
+        missing = scope_ids - set(db.session.execute(update).scalars())
+        if not missing:
+            return
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(cls), [
+                    {"scope": scope, "scope_id": scope_id, "version": 1, "updated_at": now} for scope_id in missing
+                ])
+        except IntegrityError:
+            # A concurrent request created some of the rows first; bump those and retry the rest
+            cls.bump(scope, *missing)
+
+    @classmethod
+    def current(cls, scope, scope_id=None):
+        """The version of one marker, or the sum over the whole scope when ``scope_id`` is None."""
+        query = db.session.query(func.coalesce(func.sum(cls.version), 0)).filter(cls.scope == scope)
+        if scope_id is not None:
+            query = query.filter(cls.scope_id == scope_id)
+        return query.scalar()
+
+class EventSeries(db.Model):
+    """A recurring event; each occurrence is an ordinary Event row created from this template.
+
+    Occurrences are materialized up to ``materialized_until``, either all at
+    once or lazily within a rolling window (see series.py).
+    """
+    __tablename__ = 'event_series'
+
+    id = db.Column(db.Integer, primary_key=True)
+    college_id = db.Column(db.Integer, db.ForeignKey('college.id'), nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    event_type = db.Column(db.String(50), nullable=False)
+    venue = db.Column(db.String(200))
+    max_participants = db.Column(db.Integer)
+    first_start = db.Column(db.DateTime, nullable=False)
+    duration_minutes = db.Column(db.Integer, nullable=False)
+    registration_lead_minutes = db.Column(db.Integer)  # deadline this long before each start; NULL = until start
+    frequency = db.Column(db.String(10), nullable=False)  # 'daily', 'weekly', 'monthly'
+    interval = db.Column(db.Integer, nullable=False, default=1)
+    occurrence_limit = db.Column(db.Integer)  # stop after this many occurrences...
+    until = db.Column(db.DateTime)  # ...or at this time; both NULL = open-ended
+    materialized_until = db.Column(db.DateTime)  # occurrences exist for every start up to here
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_series_active_materialized', 'is_active', 'materialized_until'),
+        db.Index('idx_series_college', 'college_id'),
+    )
+
+class SeriesOccurrence(db.Model):
+    """Links an Event to the series slot it was created for; the primary key stops double materialization."""
+    __tablename__ = 'series_occurrence'
+
+    series_id = db.Column(db.Integer, db.ForeignKey('event_series.id'), primary_key=True)
+    starts_at = db.Column(db.DateTime, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=False, unique=True)
+
+class TicketRevocation(db.Model):
+    """A cancelled registration whose signed ticket must no longer admit anyone (see tickets.py).
+
+    Rows matter only until the event ends, so ``event_end`` lets readers skip stale ones.
+    """
+    __tablename__ = 'ticket_revocation'
+
+    registration_id = db.Column(db.Integer, db.ForeignKey('registration.id'), primary_key=True)
+    event_end = db.Column(db.DateTime, nullable=False)
+    revoked_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_ticket_revocation_revoked', 'revoked_at'),
+    )
+
+# Cold storage for finished events (see archive.py). Rows keep their original ids, which
+# the hot tables never reuse (AUTOINCREMENT on SQLite, sequences elsewhere); the event
+# row also carries the counters its stats and feedback summary held.
+class EventArchive(db.Model):
+    __tablename__ = 'event_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text)
+    event_type = db.Column(db.String(50), nullable=False)
+    venue = db.Column(db.String(200))
+    start_time = db.Column(db.DateTime, nullable=False)
+    end_time = db.Column(db.DateTime, nullable=False)
+    max_participants = db.Column(db.Integer)
+    registration_deadline = db.Column(db.DateTime)
+    college_id = db.Column(db.Integer, nullable=False)
+    created_by = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime)
+    is_active = db.Column(db.Boolean)
+    requires_approval = db.Column(db.Boolean)
+    confirmed_count = db.Column(db.Integer, nullable=False, default=0)
+    check_in_count = db.Column(db.Integer, nullable=False, default=0)
+    feedback_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_event_archive_college_start', 'college_id', 'start_time'),
+        db.Index('idx_event_archive_end', 'end_time'),
+    )
+
+    @property
+    def average_rating(self):
+        return round(self.rating_sum / self.feedback_count, 2) if self.feedback_count else None
+
+class RegistrationArchive(db.Model):
+    __tablename__ = 'registration_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    event_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20))
+    registered_at = db.Column(db.DateTime)
+    notes = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('idx_registration_archive_event', 'event_id'),
+        db.Index('idx_registration_archive_registered', 'registered_at'),
+    )
+
+class CheckInArchive(db.Model):
+    __tablename__ = 'check_in_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    event_id = db.Column(db.Integer, nullable=False)
+    check_in_time = db.Column(db.DateTime)
+    notes = db.Column(db.Text)
+
+    __table_args__ = (
+        db.Index('idx_check_in_archive_event', 'event_id'),
+    )
+
+class FeedbackArchive(db.Model):
+    __tablename__ = 'feedback_archive'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    rating = db.Column(db.Integer, nullable=False)
+    comment = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+    user_id = db.Column(db.Integer, nullable=False)
+    event_id = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_feedback_archive_event', 'event_id'),
+    )
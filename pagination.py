@@ -0,0 +1,78 @@
+import base64
+from datetime import datetime
+from sqlalchemy import tuple_
+
+class KeysetPage:
+    """One page of a keyset-paginated listing, with opaque cursors for its neighbours."""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+def encode_cursor(sort_value, row_id):
+    raw = f"{sort_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """Return (sort_value, row_id) for a cursor, or None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        sort_value, row_id = raw.rsplit('|', 1)
+        return datetime.fromisoformat(sort_value), int(row_id)
+    except ValueError:
+        return None
+
+def keyset_query(query, sort_column, id_column, position=None, backwards=False,
+                 descending=False, per_page=10):
+    """The statement for one page: ``per_page + 1`` rows past ``position`` in ``(sort_column, id_column)`` order."""
+    key = tuple_(sort_column, id_column)
+
+    if position is not None:
+        # Walking "forward" in a descending listing means smaller keys
+        if descending != backwards:
+            query = query.filter(key < position)
+        else:
+            query = query.filter(key > position)
+
+    if descending != backwards:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column, id_column)
+    return query.limit(per_page + 1)
+
+def keyset_paginate(query, sort_column, id_column, cursor=None, direction='next',
+                    descending=False, per_page=10):
+    """Fetch the page after (or before) ``cursor`` ordered by ``(sort_column, id_column)``.
+
+    Every page is a single indexed range scan of ``per_page + 1`` rows: no
+    COUNT and no OFFSET, so deep pages cost the same as the first one.
+    """
+    position = decode_cursor(cursor)
+    backwards = position is not None and direction == 'prev'
+    rows = keyset_query(query, sort_column, id_column, position, backwards, descending, per_page).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+
+    def cursor_for(row):
+        return encode_cursor(getattr(row, sort_column.key), getattr(row, id_column.key))
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_more or backwards:
+            next_cursor = cursor_for(rows[-1])
+        if (has_more and backwards) or (position is not None and not backwards):
+            prev_cursor = cursor_for(rows[0])
+    return KeysetPage(rows, next_cursor, prev_cursor)
@@ -0,0 +1,105 @@
+import hashlib
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from werkzeug.security import check_password_hash, generate_password_hash
+
+class HashingBusy(RuntimeError):
+    """Raised when the hashing pool's queue is full, so callers can shed load instead of piling up."""
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = None
+
+def _executor():
+    """Lazily start the worker pool (after any server fork) and its backpressure semaphore."""
+    global _pool, _slots
+    with _pool_lock:
+        if _pool is None:
+            workers = current_app.config['PASSWORD_HASH_WORKERS']
+            _slots = threading.BoundedSemaphore(current_app.config['PASSWORD_HASH_MAX_PENDING'])
+            _pool = ProcessPoolExecutor(max_workers=workers)
+        return _pool, _slots
+
+def _run(fn, *args):
+    # PASSWORD_HASH_WORKERS = 0 keeps hashing inline (handy for tests and one-off scripts)
+    if not current_app.config['PASSWORD_HASH_WORKERS']:
+        return fn(*args)
+
+    pool, slots = _executor()
+    if not slots.acquire(timeout=current_app.config['PASSWORD_HASH_WAIT']):
+        raise HashingBusy('Password hashing queue is full')
+    try:
+        return pool.submit(fn, *args).result()
+    finally:
+        slots.release()
+
+def hash_password(password):
+    """Hash with the configured PASSWORD_HASH_METHOD, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'."""
+    return _run(generate_password_hash, password, current_app.config['PASSWORD_HASH_METHOD'])
+
+def verify_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
+
+def _hash_batch(passwords, method):
+    return [generate_password_hash(password, method) for password in passwords]
+
+def hash_passwords(passwords, batch_size=16):
+    """Hash many passwords across the pool, in order.
+
+    Only one batch per worker is queued at a time, so logins submitted
+    meanwhile wait behind a few hashes rather than the whole list.
+    """
+    method = current_app.config['PASSWORD_HASH_METHOD']
+    batches = [passwords[i:i + batch_size] for i in range(0, len(passwords), batch_size)]
+    workers = current_app.config['PASSWORD_HASH_WORKERS']
+    if not workers:
+        return [h for batch in batches for h in _hash_batch(batch, method)]
+
+    pool, _ = _executor()
+    hashes = []
+    for i in range(0, len(batches), workers):
+        futures = [pool.submit(_hash_batch, batch, method) for batch in batches[i:i + workers]]
+        for future in futures:
+            hashes.extend(future.result())
+    return hashes
+
+def unusable_password_hash():
+    """A placeholder no password can match, for accounts that must set one via a reset link."""
+    return '!' + secrets.token_urlsafe(24)
+
+def _reset_serializer():
+    return URLSafeTimedSerializer(current_app.secret_key, salt='password-reset')
+
+def _hash_fingerprint(password_hash):
+    return hashlib.sha256(password_hash.encode()).hexdigest()[:16]
+
+def reset_token(username, password_hash):
+    """Signed token for setting a password; it stops working once the password changes."""
+    return _reset_serializer().dumps({"u": username, "h": _hash_fingerprint(password_hash)})
+
+def read_reset_token(token, lookup_hash):
+    """Return the username a valid, unexpired, unused token belongs to, else None.
+
+    ``lookup_hash(username)`` returns that user's current password hash (or None).
+    """
+    try:
+        data = _reset_serializer().loads(token, max_age=current_app.config['PASSWORD_RESET_MAX_AGE'])
+    except BadSignature:
+        return None
+    current_hash = lookup_hash(data.get("u"))
+    if current_hash is None or _hash_fingerprint(current_hash) != data.get("h"):
+        return None
+    return data["u"]
+
+@lru_cache(maxsize=None)
+def _method_prefix(method):
+    # werkzeug fills in default cost parameters, so read them back from a real hash
+    return generate_password_hash('', method).split('$', 1)[0]
+
+def needs_rehash(password_hash):
+    """True when a stored hash was made with a different method or cost than configured."""
+    return password_hash.split('$', 1)[0] != _method_prefix(current_app.config['PASSWORD_HASH_METHOD'])
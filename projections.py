@@ -0,0 +1,86 @@
+import json
+from flask import Response
+from app import db
+from models import User, Registration, CheckIn, Feedback, RegistrationArchive, CheckInArchive, FeedbackArchive
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _timestamp(value):
+    return value.strftime("%Y-%m-%d %H:%M:%S") if value else None
+
+class Projection:
+    """The columns one JSON payload serializes, fetched as plain rows instead of ORM objects.
+
+    ``fields`` maps output keys to a column, or to ``(column, formatter)``.
+    Every per-event listing joins its ``model`` to the student in one
+    statement, so the query count stays the same however many rows come back.
+    """
+
+    def __init__(self, model, **fields):
+        self.model = model
+        self.fields = {name: spec if isinstance(spec, tuple) else (spec, None)
+                       for name, spec in fields.items()}
+
+    def select(self, event_id):
+        columns = [column.label(name) for name, (column, _) in self.fields.items()]
+        return db.select(*columns)\
+                 .select_from(self.model)\
+                 .join(User, User.id == self.model.user_id)\
+                 .where(self.model.event_id == event_id)\
+                 .order_by(self.model.id)
+
+    def over(self, model):
+        """The same projection read from ``model``, a table with the same columns (e.g. its archive)."""
+        fields = {}
+        for name, (column, fmt) in self.fields.items():
+            if column.class_ is self.model:
+                column = getattr(model, column.key)
+            fields[name] = (column, fmt)
+        return Projection(model, **fields)
+
+    def rows(self, event_id):
+        formatters = [(name, fmt) for name, (_, fmt) in self.fields.items() if fmt]
+        rows = [row._asdict() for row in db.session.execute(self.select(event_id))]
+        for row in rows:
+            for name, fmt in formatters:
+                row[name] = fmt(row[name])
+        return rows
+
+REGISTRATIONS = Projection(
+    Registration,
+    student_name=User.full_name,
+    student_id=User.student_id,
+    status=Registration.status,
+    registered_at=(Registration.registered_at, _timestamp),
+)
+
+ATTENDANCE = Projection(
+    CheckIn,
+    user=User.full_name,
+    check_in_time=(CheckIn.check_in_time, _timestamp),
+    notes=CheckIn.notes,
+)
+
+FEEDBACK = Projection(
+    Feedback,
+    student_name=User.full_name,
+    student_id=User.student_id,
+    rating=Feedback.rating,
+    comment=Feedback.comment,
+    submitted_at=(Feedback.created_at, _timestamp),
+)
+
+ARCHIVED_REGISTRATIONS = REGISTRATIONS.over(RegistrationArchive)
+ARCHIVED_ATTENDANCE = ATTENDANCE.over(CheckInArchive)
+ARCHIVED_FEEDBACK = FEEDBACK.over(FeedbackArchive)
+
+def json_response(payload):
+    """Serialize plain dicts/lists straight to a response, with orjson when it is installed."""
+    if orjson is not None:
+        body = orjson.dumps(payload)
+    else:
+        body = json.dumps(payload, separators=(',', ':'))
+    return Response(body, mimetype='application/json')
@@ -0,0 +1,80 @@
+from sqlalchemy import desc
+from sqlalchemy.orm import joinedload
+from app import db
+from models import Event, Registration, StudentActivity, User
+
+# The hot routes' statements, built here so the routes and ``check-plans`` explain the same SQL
+
+# Keyset orderings of the paged event listings, as keyword arguments for keyset_paginate/keyset_query
+MANAGE_EVENTS_PAGE = dict(sort_column=Event.created_at, id_column=Event.id, descending=True, per_page=10)
+BROWSE_EVENTS_PAGE = dict(sort_column=Event.start_time, id_column=Event.id, per_page=10)
+
+def college_events(college_id):
+    return Event.query.filter_by(college_id=college_id)
+
+def event_total(college_id):
+    return db.select(db.func.count(Event.id)).where(Event.college_id == college_id)
+
+def student_total(college_id):
+    return db.select(db.func.count(User.id)).where(User.college_id == college_id, User.role == 'student')
+
+def upcoming_events(college_id, now, limit):
+    return Event.query.filter(
+        Event.college_id == college_id,
+        Event.start_time > now,
+        Event.is_active == True
+    ).order_by(Event.start_time).limit(limit)
+
+def recent_events(college_id, limit):
+    return college_events(college_id).order_by(desc(Event.created_at)).limit(limit)
+
+def active_events(college_id, event_type=''):
+    """The events a student can browse, optionally of one type."""
+    query = Event.query.filter(Event.college_id == college_id, Event.is_active == True)
+    if event_type:
+        query = query.filter_by(event_type=event_type)
+    return query
+
+def college_event_types(college_id):
+    return db.session.query(Event.event_type).distinct().filter_by(college_id=college_id)
+
+def registration_statuses(user_id):
+    return db.select(Registration.event_id, Registration.status).where(Registration.user_id == user_id)
+
+def recent_registrations(user_id, limit):
+    """A student's latest registrations, with their events joined in for the dashboard."""
+    return Registration.query.filter_by(user_id=user_id)\
+                             .options(joinedload(Registration.event))\
+                             .order_by(desc(Registration.registered_at)).limit(limit)
+
+def filter_report_events(query, model, event_type, start_dt, end_dt):
+    if event_type:
+        query = query.filter(model.event_type == event_type)
+    if start_dt:
+        query = query.filter(model.start_time >= start_dt)
+    if end_dt:
+        query = query.filter(model.start_time <= end_dt)
+    return query
+
+def report_events(college_id, event_type='', start_dt=None, end_dt=None):
+    """Hot events for the reports page, with rating summaries joined in."""
+    query = Event.query.options(joinedload(Event.feedback_summary)).filter_by(college_id=college_id)
+    return filter_report_events(query, Event, event_type, start_dt, end_dt)
+
+def top_students(college_id=None, limit=3):
+    """Leaderboard read from the student_activity rollup (an indexed top-K scan)."""
+    query = db.session.query(
+        User.id,
+        User.full_name,
+        User.student_id,
+        StudentActivity.registration_count,
+        StudentActivity.check_in_count.label('checkin_count')
+    ).join(User, User.id == StudentActivity.user_id)\
+     .filter(User.role == 'student', StudentActivity.registration_count > 0)
+
+    if college_id:
+        query = query.filter(StudentActivity.college_id == college_id)
+
+    return query.order_by(desc(StudentActivity.registration_count),
+                          desc(StudentActivity.check_in_count))\
+                .limit(limit)
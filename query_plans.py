@@ -0,0 +1,109 @@
+import re
+import sys
+from datetime import datetime
+import click
+from sqlalchemy import text
+from sqlalchemy.dialects import sqlite
+from app import app, db
+from models import Registration, CheckIn, Feedback
+from pagination import keyset_query
+from projections import ATTENDANCE, FEEDBACK, REGISTRATIONS
+from queries import (BROWSE_EVENTS_PAGE, MANAGE_EVENTS_PAGE, active_events, college_event_types, college_events,
+                     event_total, recent_events, recent_registrations, registration_statuses, report_events,
+                     student_total, top_students, upcoming_events)
+from upcoming import DASHBOARD_SIZE
+
+def hot_path_queries(college_id=1, user_id=1, event_id=1):
+    """The statements each hot route runs, as (route, statement) pairs, from the builders the routes use."""
+    now = datetime.utcnow()
+    cursor = (now, 1)
+    return [
+        ('admin_dashboard: total students', student_total(college_id)),
+        ('upcoming_index: upcoming events', upcoming_events(college_id, now, DASHBOARD_SIZE)),
+        ('upcoming_index: recent events', recent_events(college_id, DASHBOARD_SIZE)),
+        ('upcoming_index: total events', event_total(college_id)),
+        ('manage_events: keyset page', keyset_query(college_events(college_id), position=cursor, **MANAGE_EVENTS_PAGE)),
+        ('browse_events: keyset page', keyset_query(active_events(college_id), position=cursor, **BROWSE_EVENTS_PAGE)),
+        ('browse_events: event types', college_event_types(college_id)),
+        ('browse_events: user registrations', registration_statuses(user_id)),
+        ('reports: events by type', report_events(college_id, 'workshop')),
+        ('reports: top students', top_students(college_id)),
+        ('student_dashboard: my registrations', recent_registrations(user_id, 5)),
+        ('get_total_registrations', REGISTRATIONS.select(event_id)),
+        ('report_attendance', ATTENDANCE.select(event_id)),
+        ('get_feedback', FEEDBACK.select(event_id)),
+    ]
+
+def explain(stmt):
+    """Return SQLite's EXPLAIN QUERY PLAN detail lines for a statement (a ``select`` or an ORM ``Query``)."""
+    stmt = getattr(stmt, 'statement', stmt)
+    compiled = stmt.compile(dialect=sqlite.dialect(paramstyle='named'))
+    rows = db.session.execute(text('EXPLAIN QUERY PLAN ' + str(compiled)), compiled.params)
+    return [row[-1] for row in rows]
+
+def full_scans(plan):
+    """Plan lines that read a whole table rather than searching an index."""
+    return [line for line in plan if line.startswith('SCAN ') and ' USING ' not in line]
+
+@app.cli.command('check-plans')
+@click.option('--verbose', is_flag=True, help='Print every plan, not just failures.')
+def check_plans(verbose):
+    """Fail if any hot-path query plan contains a full table scan (SQLite only)."""
+    if db.engine.dialect.name != 'sqlite':
+        click.echo(f'Plan checks only run on SQLite (got {db.engine.dialect.name}); skipping.')
+        return
+
+    failures = 0
+    for name, stmt in hot_path_queries():
+        plan = explain(stmt)
+        scans = full_scans(plan)
+        if scans:
+            failures += 1
+        if scans or verbose:
+            click.echo(f"{'FAIL' if scans else 'ok  '} {name}")
+            for line in plan:
+                click.echo(f'       {line}')
+
+    if failures:
+        click.echo(f'{failures} queries fall back to full table scans')
+        sys.exit(1)
+    click.echo('All hot-path queries use indexes')
+
+_SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+# Per-event JSON endpoints whose query count must not grow with the number of rows
+PER_EVENT_ENDPOINTS = [
+    ('get_total_registrations', '/event/{}/registrations', Registration),
+    ('report_attendance', '/report/attendance/{}', CheckIn),
+    ('get_feedback', '/event/{}/feedback', Feedback),
+]
+
+def query_count(client, url):
+    """``(status, queries)`` for a GET, the count read from the ``Server-Timing`` header."""
+    response = client.get(url)
+    match = _SERVER_TIMING_QUERIES.search(response.headers.get('Server-Timing', ''))
+    return response.status_code, int(match.group(1)) if match else None
+
+@app.cli.command('check-query-counts')
+@click.option('--max-queries', default=3, show_default=True, help='Budget per request.')
+def check_query_counts(max_queries):
+    """Fail if a per-event endpoint's query count depends on how many rows the event has."""
+    client = app.test_client()
+    failures = 0
+    for name, url, model in PER_EVENT_ENDPOINTS:
+        counts = db.session.query(model.event_id, db.func.count(model.id))\
+                           .group_by(model.event_id).order_by(db.func.count(model.id)).all()
+        if not counts:
+            click.echo(f'skip {name}: no rows to measure')
+            continue
+        (small_event, small_rows), (big_event, big_rows) = counts[0], counts[-1]
+        _, small = query_count(client, url.format(small_event))
+        status, big = query_count(client, url.format(big_event))
+        ok = status == 200 and big is not None and big == small and big <= max_queries
+        failures += not ok
+        click.echo(f"{'ok  ' if ok else 'FAIL'} {name}: {small} queries for {small_rows} rows, "
+                   f"{big} queries for {big_rows} rows")
+
+    if failures:
+        sys.exit(1)
+    click.echo('Per-event endpoints run a constant number of queries')
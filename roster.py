@@ -0,0 +1,201 @@
+import csv
+import io
+import json
+from itertools import islice
+import click
+from sqlalchemy.exc import IntegrityError
+from app import app, db
+from models import College, User
+from passwords import hash_passwords, reset_token, unusable_password_hash
+
+# Columns a roster may carry; username, email and full_name are required
+ROSTER_FIELDS = ['username', 'email', 'full_name', 'role', 'student_id', 'department',
+                 'year_of_study', 'phone', 'password']
+IMPORT_ROLES = ('student', 'staff')
+
+class RosterError(ValueError):
+    """The file as a whole cannot be read (unknown format, bad encoding, missing header)."""
+
+def _text(stream):
+    if isinstance(stream, io.TextIOBase):
+        return stream
+    return io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+def parse_roster(stream, fmt):
+    """Yield ``(line, record)`` per row; ``record`` is a dict, or an error string for unreadable lines."""
+    if fmt == 'csv':
+        reader = csv.DictReader(_text(stream))
+        if not reader.fieldnames or not {'username', 'email', 'full_name'} <= set(reader.fieldnames):
+            raise RosterError('CSV header must include username, email and full_name')
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == 'jsonl':
+        for line, raw in enumerate(_text(stream), start=1):
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                yield line, 'not valid JSON'
+                continue
+            yield line, record if isinstance(record, dict) else 'each line must be a JSON object'
+    else:
+        raise RosterError("Roster format must be 'csv' or 'jsonl'")
+
+def _clean(record, college_id):
+    """Normalize one record into User column values; returns ``(values, errors)``."""
+    values = {field: (str(record.get(field)).strip() if record.get(field) not in (None, '') else None)
+              for field in ROSTER_FIELDS}
+    errors = []
+    for field in ('username', 'email', 'full_name'):
+        if not values[field]:
+            errors.append(f'{field} is required')
+    for field in ('username', 'email', 'full_name', 'student_id', 'department', 'phone'):
+        limit = User.__table__.c[field].type.length
+        if values[field] and len(values[field]) > limit:
+            errors.append(f'{field} is longer than {limit} characters')
+    if values['email'] and '@' not in values['email']:
+        errors.append('email is not a valid address')
+
+    values['role'] = (values['role'] or 'student').lower()
+    if values['role'] not in IMPORT_ROLES:
+        errors.append(f"role must be one of {', '.join(IMPORT_ROLES)}")
+    if values['year_of_study'] is not None:
+        try:
+            values['year_of_study'] = int(values['year_of_study'])
+        except ValueError:
+            errors.append('year_of_study must be a number')
+
+    values['college_id'] = college_id
+    return values, errors
+
+def _insert(rows):
+    """Insert a chunk in one executemany; on a conflict, retry row by row to pin down the culprits."""
+    if not rows:
+        return [], []
+    try:
+        db.session.execute(db.insert(User), rows)
+        db.session.commit()
+        return rows, []
+    except IntegrityError:
+        db.session.rollback()
+
+    # Someone took a username/email between our check and the insert
+    inserted, failed = [], []
+    for row in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(User), [row])
+            inserted.append(row)
+        except IntegrityError:
+            failed.append(row)
+    db.session.commit()
+    return inserted, failed
+
+def import_roster(records, college_id, chunk_size=None):
+    """Create users from parsed ``(line, record)`` pairs, committing every ``chunk_size`` rows.
+
+    Bad rows are reported and skipped; the rest of the file still loads.
+    Rows without a password get an unusable hash and a reset token instead
+    of waiting on the hashing pool. Returns a dict with ``created``,
+    ``failed``, per-row ``errors`` and ``reset_tokens``.
+    """
+    chunk_size = chunk_size or app.config['ROSTER_CHUNK_SIZE']
+    report = {"created": 0, "failed": 0, "errors": [], "reset_tokens": []}
+    seen_usernames, seen_emails = set(), set()
+    records = iter(records)
+
+    def fail(line, username, *errors):
+        report["failed"] += 1
+        report["errors"].append({"line": line, "username": username, "errors": list(errors)})
+
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            break
+
+        candidates = []
+        for line, record in chunk:
+            if isinstance(record, str):
+                fail(line, None, record)
+                continue
+            values, errors = _clean(record, college_id)
+            if values['username'] in seen_usernames:
+                errors.append('username appears earlier in the file')
+            if values['email'] in seen_emails:
+                errors.append('email appears earlier in the file')
+            if errors:
+                fail(line, values['username'], *errors)
+                continue
+            seen_usernames.add(values['username'])
+            seen_emails.add(values['email'])
+            candidates.append((line, values))
+
+        # Two set-based lookups cover the whole chunk
+        taken_usernames = {u for (u,) in db.session.query(User.username).filter(
+            User.username.in_([v['username'] for _, v in candidates]))}
+        taken_emails = {e for (e,) in db.session.query(User.email).filter(
+            User.email.in_([v['email'] for _, v in candidates]))}
+        valid = []
+        for line, values in candidates:
+            errors = []
+            if values['username'] in taken_usernames:
+                errors.append('username already exists')
+            if values['email'] in taken_emails:
+                errors.append('email already registered')
+            if errors:
+                fail(line, values['username'], *errors)
+            else:
+                valid.append((line, values))
+
+        with_password = [values for _, values in valid if values['password']]
+        for values, password_hash in zip(with_password, hash_passwords([v['password'] for v in with_password])):
+            values['password_hash'] = password_hash
+        for _, values in valid:
+            if not values.pop('password'):
+                values['password_hash'] = unusable_password_hash()
+                values['needs_reset'] = True
+
+        rows = [{k: v for k, v in values.items() if k != 'needs_reset'} for _, values in valid]
+        inserted, conflicted = _insert(rows)
+        report["created"] += len(inserted)
+        lines = {values['username']: (line, values) for line, values in valid}
+        for row in conflicted:
+            fail(lines[row['username']][0], row['username'], 'username or email already exists')
+        for row in inserted:
+            if lines[row['username']][1].get('needs_reset'):
+                report["reset_tokens"].append({"username": row['username'], "email": row['email'],
+                                               "token": reset_token(row['username'], row['password_hash'])})
+
+    report["errors"].sort(key=lambda e: e["line"])
+    return report
+
+@app.cli.command('import-roster')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--college-id', type=int, required=True, help='College the users join.')
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']), default=None,
+              help='Defaults to the file extension.')
+@click.option('--reset-links', type=click.Path(dir_okay=False),
+              help='Write username,email,reset path for accounts imported without a password.')
+def import_roster_command(path, college_id, fmt, reset_links):
+    """Bulk-create users for a college from a CSV or JSONL roster."""
+    if db.session.get(College, college_id) is None:
+        raise click.ClickException(f'College {college_id} does not exist')
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        try:
+            report = import_roster(parse_roster(f, fmt), college_id)
+        except RosterError as e:
+            raise click.ClickException(str(e))
+
+    for error in report["errors"]:
+        click.echo(f"line {error['line']}: {error['username'] or '-'}: {'; '.join(error['errors'])}")
+    click.echo(f"{report['created']} users created, {report['failed']} rows rejected")
+
+    if reset_links:
+        with open(reset_links, 'w', newline='') as out:
+            writer = csv.writer(out)
+            writer.writerow(['username', 'email', 'reset_path'])
+            for entry in report["reset_tokens"]:
+                writer.writerow([entry['username'], entry['email'], f"/reset_password/{entry['token']}"])
+        click.echo(f"{len(report['reset_tokens'])} reset links written to {reset_links}")
@@ -1,10 +1,35 @@
-from flask import render_template, request, redirect, url_for, flash, jsonify
+from flask import render_template, request, redirect, url_for, flash, jsonify, Response, stream_with_context, abort
 from flask_login import login_user, logout_user, login_required, current_user
-from werkzeug.security import check_password_hash, generate_password_hash
-from sqlalchemy import func, desc, or_
+from sqlalchemy import func, desc, or_, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+import csv
+import io
+import json
+from collections import Counter
 from datetime import datetime, timedelta
-from app import app, db
-from models import Feedback, User, College, Event, Registration, CheckIn
+from app import app, db, report_cache
+from models import Feedback, FeedbackSummary, User, College, Event, EventStats, StudentActivity, Registration, CheckIn, ReportJob, DataVersion, EventSeries, SeriesOccurrence, EventArchive, RegistrationArchive, FeedbackArchive
+from analytics import attendance_analytics, rate
+from archive import reaches_archive
+from conditional import conditional
+from jobs import JOB_KINDS, enqueue, job_kind
+from live import live_publisher, snapshot, stream
+from pagination import KeysetPage, keyset_paginate
+from projections import (ARCHIVED_ATTENDANCE, ARCHIVED_FEEDBACK, ARCHIVED_REGISTRATIONS, ATTENDANCE, FEEDBACK,
+                         REGISTRATIONS, json_response)
+from queries import (BROWSE_EVENTS_PAGE, MANAGE_EVENTS_PAGE, active_events, college_event_types, college_events,
+                     filter_report_events, recent_registrations, registration_statuses, report_events,
+                     student_total, top_students)
+from passwords import HashingBusy, hash_password, needs_rehash, read_reset_token, verify_password
+from roster import RosterError, import_roster, parse_roster
+from search import search_events
+from series import FREQUENCIES, PROPAGATED_FIELDS, ensure_materialized, is_finite, materialize, propagate, window_end
+from upcoming import request_now, upcoming_index
+import waitlist
+from tickets import TicketError, issue_ticket, revocations, ticket_qr, verify_ticket
 
 @app.route('/')
 def index():
@@ -22,7 +47,21 @@ def login():
         password = request.form['password']
         user = User.query.filter_by(username=username, is_active=True).first()
         
-        if user and check_password_hash(user.password_hash, password):
+        try:
+            valid = user is not None and verify_password(user.password_hash, password)
+        except HashingBusy:
+            flash('The server is busy, please try again in a moment.', 'warning')
+            return render_template('login.html'), 503
+        
+        if valid:
+            # Upgrade hashes made with an older method or cost while we have the plaintext
+            if needs_rehash(user.password_hash):
+                try:
+                    user.password_hash = hash_password(password)
+                    db.session.commit()
+                except HashingBusy:
+                    pass  # retried on a later login
+            
             login_user(user)
             flash('Login successful!', 'success')
             next_page = request.args.get('next')
@@ -61,11 +100,17 @@ def register():
             flash('Email already registered', 'error')
             return render_template('register.html', colleges=College.query.all())
         
+        try:
+            password_hash = hash_password(password)
+        except HashingBusy:
+            flash('The server is busy, please try again in a moment.', 'warning')
+            return render_template('register.html', colleges=College.query.all()), 503
+        
         # Create new user
         user = User(
             username=username,
             email=email,
-            password_hash=generate_password_hash(password),
+            password_hash=password_hash,
             full_name=full_name,
             role=role,
             college_id=college_id,
@@ -84,6 +129,35 @@ def register():
     colleges = College.query.all()
     return render_template('register.html', colleges=colleges)
 
+def _password_hash_for(username):
+    return db.session.query(User.password_hash).filter_by(username=username).scalar()
+
+@app.route('/reset_password/<token>', methods=['GET', 'POST'])
+def reset_password(token):
+    username = read_reset_token(token, _password_hash_for)
+    if username is None:
+        flash('This password link is invalid, expired or already used.', 'error')
+        return redirect(url_for('login'))
+    
+    if request.method == 'POST':
+        password = request.form['password']
+        if len(password) < 8:
+            flash('Password must be at least 8 characters', 'error')
+        elif password != request.form.get('confirm_password'):
+            flash('Passwords do not match', 'error')
+        else:
+            try:
+                password_hash = hash_password(password)
+            except HashingBusy:
+                flash('The server is busy, please try again in a moment.', 'warning')
+                return render_template('reset_password.html', username=username), 503
+            User.query.filter_by(username=username).first().password_hash = password_hash
+            db.session.commit()
+            flash('Password set! Please login.', 'success')
+            return redirect(url_for('login'))
+    
+    return render_template('reset_password.html', username=username)
+
 @app.route('/logout')
 @login_required
 def logout():
@@ -91,6 +165,125 @@ def logout():
     flash('You have been logged out.', 'info')
     return redirect(url_for('index'))
 
+def _event_json(event):
+    return {
+        "id": event.id,
+        "title": event.title,
+        "event_type": event.event_type,
+        "venue": event.venue,
+        "start_time": event.start_time.strftime("%Y-%m-%d %H:%M:%S"),
+        "end_time": event.end_time.strftime("%Y-%m-%d %H:%M:%S"),
+        "max_participants": event.max_participants,
+        "registration_count": event.registration_count,
+        "check_in_count": event.check_in_count,
+        "is_active": event.is_active,
+        "is_registration_open": event.is_registration_open
+    }
+
+def _top_students(college_id=None, limit=3):
+    return top_students(college_id, limit).all()
+
+def _event_report_row(event):
+    """Plain snapshot of an event for cached report fragments."""
+    return {
+        "id": event.id,
+        "title": event.title,
+        "event_type": event.event_type,
+        "venue": event.venue,
+        "start_time": event.start_time,
+        "max_participants": event.max_participants,
+        "registration_count": event.registration_count,
+        "check_in_count": event.check_in_count,
+        "attendance_rate": rate(event.check_in_count, event.registration_count),
+        "feedback_count": event.feedback_summary.feedback_count if event.feedback_summary else 0,
+        "average_rating": event.feedback_summary.average_rating if event.feedback_summary else None
+    }
+
+def _archived_event_report_row(event):
+    """Same snapshot for an archived event, whose counters were frozen onto the row."""
+    return {
+        "id": event.id,
+        "title": event.title,
+        "event_type": event.event_type,
+        "venue": event.venue,
+        "start_time": event.start_time,
+        "max_participants": event.max_participants,
+        "registration_count": event.confirmed_count,
+        "check_in_count": event.check_in_count,
+        "attendance_rate": rate(event.check_in_count, event.confirmed_count),
+        "feedback_count": event.feedback_count,
+        "average_rating": event.average_rating
+    }
+
+def _report_events(college_id, event_type='', start_date='', end_date=''):
+    start_dt = datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
+    end_dt = datetime.strptime(end_date, '%Y-%m-%d') if end_date else None
+    
+    rows = [_event_report_row(e) for e in report_events(college_id, event_type, start_dt, end_dt)]
+    
+    # Long-finished events live in the archive; read it only when the range reaches back that far
+    if reaches_archive(start_dt):
+        archived = EventArchive.query.filter_by(college_id=college_id).order_by(EventArchive.start_time)
+        rows += [_archived_event_report_row(e) for e in
+                 filter_report_events(archived, EventArchive, event_type, start_dt, end_dt)]
+    return rows
+
+def _event_type_stats(college_id):
+    rows = db.session.query(
+        Event.event_type,
+        func.count(func.distinct(Event.id)).label('event_count'),
+        func.count(Registration.id).label('total_registrations')
+    ).outerjoin(Registration, Registration.event_id == Event.id)\
+     .filter(Event.college_id == college_id)\
+     .group_by(Event.event_type).all()
+    stats = {row.event_type: row._asdict() for row in rows}
+    
+    # All-time figures, so archived events count too
+    if reaches_archive(None):
+        archived = db.session.query(
+            EventArchive.event_type,
+            func.count(func.distinct(EventArchive.id)).label('event_count'),
+            func.count(RegistrationArchive.id).label('total_registrations')
+        ).outerjoin(RegistrationArchive, RegistrationArchive.event_id == EventArchive.id)\
+         .filter(EventArchive.college_id == college_id)\
+         .group_by(EventArchive.event_type).all()
+        for row in archived:
+            entry = stats.setdefault(row.event_type, {"event_type": row.event_type, "event_count": 0,
+                                                      "total_registrations": 0})
+            entry["event_count"] += row.event_count
+            entry["total_registrations"] += row.total_registrations
+    return list(stats.values())
+
+def _event_types(college_id):
+    event_types = db.select(Event.event_type).where(Event.college_id == college_id)
+    if reaches_archive(None):
+        event_types = db.union(event_types,
+                               db.select(EventArchive.event_type).where(EventArchive.college_id == college_id))
+    else:
+        event_types = event_types.distinct()
+    return [et[0] for et in db.session.execute(event_types)]
+
+def _attendance_analytics(college_id, start_date='', end_date=''):
+    start_dt = datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
+    end_dt = datetime.strptime(end_date, '%Y-%m-%d') if end_date else None
+    return attendance_analytics(college_id, start_dt, end_dt)
+
+def _windowed_analytics(college_id, start_date='', end_date=''):
+    """Cached analytics for the page and its JSON twin: ``(analytics, start date used)``.
+
+    Without a start date they cover the last ANALYTICS_DEFAULT_DAYS, so a
+    rebuild after each write stays bounded; the ``analytics`` report job
+    computes the full history in the background.
+    """
+    if not start_date:
+        start_date = (request_now() - timedelta(days=app.config['ANALYTICS_DEFAULT_DAYS'])).strftime('%Y-%m-%d')
+    analytics = report_cache.get_or_compute(
+        college_id, 'analytics',
+        lambda: _attendance_analytics(college_id, start_date, end_date),
+        start_date=start_date, end_date=end_date
+    )
+    return analytics, start_date
+
 # Admin Routes
 @app.route('/admin/dashboard')
 @login_required
@@ -99,26 +292,17 @@ def admin_dashboard():
         flash('Access denied', 'error')
         return redirect(url_for('student_dashboard'))
     
-    # Get statistics for the current college
-    total_events = Event.query.filter_by(college_id=current_user.college_id).count()
-    total_students = User.query.filter_by(college_id=current_user.college_id, role='student').count()
-    
-    # Recent events
-    recent_events = Event.query.filter_by(college_id=current_user.college_id)\
-                              .order_by(desc(Event.created_at)).limit(5).all()
+    ensure_materialized(current_user.college_id)
     
-    # Upcoming events
-    upcoming_events = Event.query.filter(
-        Event.college_id == current_user.college_id,
-        Event.start_time > datetime.utcnow(),
-        Event.is_active == True
-    ).order_by(Event.start_time).limit(5).all()
+    # Event lists and total come from the in-process index
+    events = upcoming_index.get(current_user.college_id)
+    total_students = db.session.scalar(student_total(current_user.college_id))
     
     return render_template('admin/dashboard.html', 
-                         total_events=total_events,
+                         total_events=events.total,
                          total_students=total_students,
-                         recent_events=recent_events,
-                         upcoming_events=upcoming_events)
+                         recent_events=events.recent,
+                         upcoming_events=events.upcoming)
 
 @app.route('/admin/events')
 @login_required
@@ -127,12 +311,36 @@ def manage_events():
         flash('Access denied', 'error')
         return redirect(url_for('student_dashboard'))
     
-    page = request.args.get('page', 1, type=int)
-    events = Event.query.filter_by(college_id=current_user.college_id)\
-                       .order_by(desc(Event.created_at))\
-                       .paginate(page=page, per_page=10, error_out=False)
+    ensure_materialized(current_user.college_id)
+    
+    events = keyset_paginate(
+        college_events(current_user.college_id),
+        cursor=request.args.get('cursor'),
+        direction=request.args.get('direction', 'next'),
+        **MANAGE_EVENTS_PAGE
+    )
+    
+    if request.args.get('format') == 'json':
+        return jsonify({
+            "events": [_event_json(e) for e in events.items],
+            "next_cursor": events.next_cursor,
+            "prev_cursor": events.prev_cursor
+        })
+    
+    # Which rows on this page are series occurrences, in one lookup
+    series_ids = dict(db.session.query(SeriesOccurrence.event_id, SeriesOccurrence.series_id)
+                                .filter(SeriesOccurrence.event_id.in_([e.id for e in events.items])))
     
-    return render_template('admin/manage_events.html', events=events)
+    return render_template('admin/manage_events.html', events=events, series_ids=series_ids)
+
+def _max_participants(value):
+    """The capacity a form asks for: None when left blank (unlimited), else a whole number of at least 1."""
+    if not value or not value.strip():
+        return None
+    capacity = int(value)
+    if capacity < 1:
+        raise ValueError(value)
+    return capacity
 
 @app.route('/admin/create_event', methods=['GET', 'POST'])
 @login_required
@@ -148,12 +356,20 @@ def create_event():
         venue = request.form['venue']
         start_time = datetime.strptime(request.form['start_time'], '%Y-%m-%dT%H:%M')
         end_time = datetime.strptime(request.form['end_time'], '%Y-%m-%dT%H:%M')
-        max_participants = request.form.get('max_participants')
+        try:
+            max_participants = _max_participants(request.form.get('max_participants'))
+        except ValueError:
+            flash('Max participants must be a whole number of at least 1, or empty for unlimited', 'error')
+            return redirect(url_for('create_event'))
         registration_deadline = request.form.get('registration_deadline')
         
         if registration_deadline:
             registration_deadline = datetime.strptime(registration_deadline, '%Y-%m-%dT%H:%M')
         
+        if request.form.get('repeat') in FREQUENCIES:
+            return _create_series(title, description, event_type, venue, start_time, end_time,
+                                  max_participants, registration_deadline)
+        
         event = Event(
             title=title,
             description=description,
@@ -161,7 +377,7 @@ def create_event():
             venue=venue,
             start_time=start_time,
             end_time=end_time,
-            max_participants=int(max_participants) if max_participants else None,
+            max_participants=max_participants,
             registration_deadline=registration_deadline,
             college_id=current_user.college_id,
             created_by=current_user.id
@@ -169,12 +385,139 @@ def create_event():
         
         db.session.add(event)
         db.session.commit()
+        report_cache.invalidate(event.college_id)
+        upcoming_index.invalidate(event.college_id)
         
         flash('Event created successfully!', 'success')
         return redirect(url_for('manage_events'))
     
     return render_template('admin/create_event.html')
 
+def _create_series(title, description, event_type, venue, start_time, end_time,
+                   max_participants, registration_deadline):
+    """Save a recurring event and materialize its first occurrences (or all of them on request)."""
+    repeat_count = request.form.get('repeat_count')
+    repeat_until = request.form.get('repeat_until')
+    materialize_all = bool(request.form.get('materialize_all'))
+    
+    series = EventSeries(
+        title=title,
+        description=description,
+        event_type=event_type,
+        venue=venue,
+        max_participants=max_participants,
+        first_start=start_time,
+        duration_minutes=int((end_time - start_time).total_seconds() // 60),
+        registration_lead_minutes=int((start_time - registration_deadline).total_seconds() // 60)
+                                  if registration_deadline else None,
+        frequency=request.form['repeat'],
+        interval=max(int(request.form.get('repeat_interval') or 1), 1),
+        occurrence_limit=int(repeat_count) if repeat_count else None,
+        until=datetime.strptime(repeat_until, '%Y-%m-%d') + timedelta(days=1) if repeat_until else None,
+        college_id=current_user.college_id,
+        created_by=current_user.id
+    )
+    
+    if end_time <= start_time:
+        flash('End time must be after the start time', 'error')
+        return redirect(url_for('create_event'))
+    if materialize_all and not is_finite(series):
+        flash('Set a number of occurrences or an end date to create every occurrence up front', 'error')
+        return redirect(url_for('create_event'))
+    
+    db.session.add(series)
+    db.session.commit()
+    created = materialize(series, None if materialize_all else window_end())
+    
+    flash(f'Recurring event created with {created} occurrence(s) scheduled so far', 'success')
+    return redirect(url_for('manage_events'))
+
+@app.route('/admin/series/<int:series_id>', methods=['GET', 'POST'])
+@login_required
+def edit_series(series_id):
+    """Edit a recurring event; changes apply to its future occurrences, past ones are left as they were."""
+    if current_user.role not in ['admin', 'staff']:
+        flash('Access denied', 'error')
+        return redirect(url_for('student_dashboard'))
+    
+    series = EventSeries.query.filter_by(id=series_id, college_id=current_user.college_id).first_or_404()
+    
+    if request.method == 'POST':
+        try:
+            max_participants = _max_participants(request.form.get('max_participants'))
+        except ValueError:
+            flash('Max participants must be a whole number of at least 1, or empty for unlimited', 'error')
+            return redirect(url_for('edit_series', series_id=series.id))
+        series.title = request.form['title']
+        series.description = request.form['description']
+        series.event_type = request.form['event_type']
+        series.venue = request.form['venue']
+        series.max_participants = max_participants
+        fields = PROPAGATED_FIELDS
+        is_active = not request.form.get('end_series')
+        if is_active != series.is_active:
+            series.is_active = is_active
+            fields += ('is_active',)
+        
+        event_ids = propagate(series, fields)
+        # A raised capacity goes to the waitlists first, oldest entry first
+        promoted = waitlist.promote(event_ids)
+        # Titles and capacities show in every per-event JSON endpoint
+        for scope in ('registrations', 'checkins', 'feedback'):
+            DataVersion.bump(scope, *event_ids)
+        db.session.commit()
+        report_cache.invalidate(series.college_id)
+        upcoming_index.invalidate(series.college_id)
+        live_publisher.notify(*promoted)
+        _announce_promotions(promoted)
+        
+        flash(f'Series updated; {len(event_ids)} upcoming occurrence(s) changed', 'success')
+        return redirect(url_for('manage_events'))
+    
+    upcoming = db.session.query(db.func.count(SeriesOccurrence.event_id))\
+                         .filter(SeriesOccurrence.series_id == series.id,
+                                 SeriesOccurrence.starts_at > datetime.utcnow()).scalar()
+    
+    return render_template('admin/edit_series.html', series=series, upcoming=upcoming)
+
+@app.route('/admin/users/import', methods=['GET', 'POST'])
+@login_required
+def import_users():
+    """Bulk-create students/staff for the admin's college from an uploaded CSV or JSONL roster."""
+    if current_user.role != 'admin':
+        flash('Access denied', 'error')
+        return redirect(url_for('admin_dashboard'))
+    
+    if request.method == 'GET':
+        return render_template('admin/import_users.html', report=None)
+    
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        error = 'Choose a CSV or JSONL file to import'
+    else:
+        fmt = request.form.get('format') or \
+              ('jsonl' if upload.filename.lower().endswith(('.jsonl', '.ndjson')) else 'csv')
+        try:
+            report = import_roster(parse_roster(upload.stream, fmt), current_user.college_id)
+            error = None
+        except (RosterError, UnicodeDecodeError) as e:
+            error = str(e) if isinstance(e, RosterError) else 'The file must be UTF-8 encoded'
+    
+    wants_json = request.args.get('format') == 'json'
+    if error:
+        if wants_json:
+            return jsonify({"error": error}), 400
+        flash(error, 'error')
+        return render_template('admin/import_users.html', report=None), 400
+    
+    if report["created"]:
+        report_cache.invalidate(current_user.college_id)
+    if wants_json:
+        for entry in report["reset_tokens"]:
+            entry["reset_url"] = url_for('reset_password', token=entry.pop("token"), _external=True)
+        return jsonify(report)
+    return render_template('admin/import_users.html', report=report)
+
 @app.route('/admin/reports')
 @login_required
 def reports():
@@ -187,57 +530,39 @@ def reports():
     start_date = request.args.get('start_date', '')
     end_date = request.args.get('end_date', '')
     
-    # Base query for events in current college
-    base_query = Event.query.filter_by(college_id=current_user.college_id)
-    
-    # Apply filters
-    if event_type:
-        base_query = base_query.filter_by(event_type=event_type)
-    
-    if start_date:
-        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        base_query = base_query.filter(Event.start_time >= start_dt)
-    
-    if end_date:
-        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-        base_query = base_query.filter(Event.start_time <= end_dt)
+    college_id = current_user.college_id
     
-    events = base_query.all()
+    # Each fragment is cached per college; only the event list depends on the filters
+    events = report_cache.get_or_compute(
+        college_id, 'events',
+        lambda: _report_events(college_id, event_type, start_date, end_date),
+        event_type=event_type, start_date=start_date, end_date=end_date
+    )
     
     # Top 3 Most Active Students
-    top_students = db.session.query(
-        User.id,
-        User.full_name,
-        User.student_id,
-        func.count(Registration.id).label('registration_count'),
-        func.count(CheckIn.id).label('checkin_count')
-    ).join(Registration, Registration.user_id == User.id)\
-     .outerjoin(CheckIn, CheckIn.user_id == User.id)\
-     .filter(User.college_id == current_user.college_id)\
-     .filter(User.role == 'student')\
-     .group_by(User.id)\
-     .order_by(desc('registration_count'), desc('checkin_count'))\
-     .limit(3).all()
+    top_students = report_cache.get_or_compute(
+        college_id, 'top_students',
+        lambda: [row._asdict() for row in _top_students(college_id, limit=3)]
+    )
     
     # Event type statistics
-    event_type_stats = db.session.query(
-        Event.event_type,
-        func.count(Event.id).label('event_count'),
-        func.count(Registration.id).label('total_registrations')
-    ).outerjoin(Registration, Registration.event_id == Event.id)\
-     .filter(Event.college_id == current_user.college_id)\
-     .group_by(Event.event_type).all()
+    event_type_stats = report_cache.get_or_compute(college_id, 'event_type_stats',
+                                                   lambda: _event_type_stats(college_id))
     
     # Event types for filter dropdown
-    event_types = db.session.query(Event.event_type).distinct()\
-                           .filter_by(college_id=current_user.college_id).all()
-    event_types = [et[0] for et in event_types]
+    event_types = report_cache.get_or_compute(college_id, 'event_types',
+                                              lambda: _event_types(college_id))
+    
+    # Attendance breakdowns follow the date range (bounded by default) but cover every event type
+    analytics, analytics_start = _windowed_analytics(college_id, start_date, end_date)
     
     return render_template('admin/reports.html',
                          events=events,
                          top_students=top_students,
                          event_type_stats=event_type_stats,
                          event_types=event_types,
+                         analytics=analytics,
+                         analytics_start=analytics_start,
                          current_filters={
                              'event_type': event_type,
                              'start_date': start_date,
@@ -252,17 +577,13 @@ def student_dashboard():
         flash('Access denied', 'error')
         return redirect(url_for('admin_dashboard'))
     
-    # Upcoming events
-    upcoming_events = Event.query.filter(
-        Event.college_id == current_user.college_id,
-        Event.start_time > datetime.utcnow(),
-        Event.is_active == True
-    ).order_by(Event.start_time).limit(5).all()
+    ensure_materialized(current_user.college_id)
+    
+    # Upcoming events, shared by every student of the college
+    upcoming_events = upcoming_index.get(current_user.college_id).upcoming
     
     # My recent registrations
-    my_registrations = Registration.query.filter_by(user_id=current_user.id)\
-                                        .order_by(desc(Registration.registered_at))\
-                                        .limit(5).all()
+    my_registrations = recent_registrations(current_user.id, 5).all()
     
     return render_template('student/dashboard.html',
                          upcoming_events=upcoming_events,
@@ -275,35 +596,44 @@ def browse_events():
         flash('Access denied', 'error')
         return redirect(url_for('admin_dashboard'))
     
-    page = request.args.get('page', 1, type=int)
+    ensure_materialized(current_user.college_id)
+    
     event_type = request.args.get('event_type', '')
+    search = request.args.get('q', '').strip()
     
     # Base query for events in current college
-    query = Event.query.filter(
-        Event.college_id == current_user.college_id,
-        Event.is_active == True
-    )
-    
-    if event_type:
-        query = query.filter_by(event_type=event_type)
+    query = active_events(current_user.college_id, event_type)
     
-    events = query.order_by(Event.start_time).paginate(
-        page=page, per_page=10, error_out=False
-    )
+    if search:
+        # Search results come back ranked by relevance as a single page
+        events = KeysetPage(search_events(query, search))
+    else:
+        events = keyset_paginate(
+            query,
+            cursor=request.args.get('cursor'),
+            direction=request.args.get('direction', 'next'),
+            **BROWSE_EVENTS_PAGE
+        )
     
     # Get event types for filter
-    event_types = db.session.query(Event.event_type).distinct()\
-                           .filter_by(college_id=current_user.college_id).all()
-    event_types = [et[0] for et in event_types]
+    event_types = [et[0] for et in college_event_types(current_user.college_id)]
     
     # Get user's registrations
-    user_registrations = {r.event_id: r.status for r in 
-                         Registration.query.filter_by(user_id=current_user.id).all()}
+    user_registrations = dict(db.session.execute(registration_statuses(current_user.id)).all())
+    
+    if request.args.get('format') == 'json':
+        return jsonify({
+            "events": [dict(_event_json(e), registration_status=user_registrations.get(e.id))
+                       for e in events.items],
+            "next_cursor": events.next_cursor,
+            "prev_cursor": events.prev_cursor
+        })
     
     return render_template('student/events.html',
                          events=events,
                          event_types=event_types,
                          current_filter=event_type,
+                         search=search,
                          user_registrations=user_registrations)
 
 @app.route('/student/my_events')
@@ -314,9 +644,18 @@ def my_events():
         return redirect(url_for('admin_dashboard'))
     
     registrations = Registration.query.filter_by(user_id=current_user.id)\
+                                    .options(joinedload(Registration.event))\
                                     .order_by(desc(Registration.registered_at)).all()
     
-    return render_template('student/my_events.html', registrations=registrations)
+    # Entry tickets for confirmed registrations that can still be scanned
+    now = request_now()
+    tickets = {}
+    for registration in registrations:
+        if registration.status == 'confirmed' and registration.event.end_time >= now:
+            token = issue_ticket(registration, registration.event)
+            tickets[registration.id] = {"token": token, "qr": ticket_qr(token)}
+    
+    return render_template('student/my_events.html', registrations=registrations, tickets=tickets)
 
 @app.route('/register_event/<int:event_id>', methods=['POST'])
 @login_required
@@ -337,33 +676,37 @@ def register_event(event_id):
         flash('Registration is closed for this event', 'error')
         return redirect(url_for('browse_events'))
     
-    # Check if already registered
-    existing_registration = Registration.query.filter_by(
-        user_id=current_user.id, event_id=event_id
-    ).first()
-    
-    if existing_registration:
-        flash('You are already registered for this event', 'warning')
-        return redirect(url_for('browse_events'))
-    
-    # Check capacity
-    if event.max_participants:
-        current_count = event.registration_count
-        if current_count >= event.max_participants:
-            flash('Event is full', 'error')
-            return redirect(url_for('browse_events'))
+    # Reserve a seat atomically; overflow goes to the waitlist instead of oversubscribing
+    if EventStats.reserve_seat(event_id, event.max_participants):
+        status = 'confirmed'
+    else:
+        status = 'waitlist'
     
-    # Create registration
     registration = Registration(
         user_id=current_user.id,
         event_id=event_id,
-        status='confirmed'
+        status=status
     )
     
+    # The unique constraint catches duplicates; rolling back also releases the seat
     db.session.add(registration)
-    db.session.commit()
+    try:
+        StudentActivity.increment(current_user.id, registration_count=1)
+        DataVersion.bump('registrations', event_id)
+        DataVersion.bump('students', event.college_id)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        flash('You are already registered for this event', 'warning')
+        return redirect(url_for('browse_events'))
+    report_cache.invalidate(event.college_id)
+    live_publisher.notify(event_id)
+    
+    if status == 'waitlist':
+        flash('Event is full. You have been added to the waitlist.', 'info')
+        return redirect(url_for('browse_events'))
     
-    flash('Successfully registered for the event!', 'success')
+    flash('Successfully registered for the event! Your entry ticket is in My Events.', 'success')
     return redirect(url_for('browse_events'))
 
 @app.route('/cancel_registration/<int:event_id>', methods=['POST'])
@@ -373,15 +716,109 @@ def cancel_registration(event_id):
         user_id=current_user.id, event_id=event_id
     ).first_or_404()
     
-    registration.status = 'cancelled'
+    # A freed seat goes to the head of the waitlist in the same transaction
+    _, promoted = waitlist.cancel([registration])
+    DataVersion.bump('registrations', event_id)
+    DataVersion.bump('students', current_user.college_id)
     db.session.commit()
+    revocations.expire()
+    report_cache.invalidate(current_user.college_id)
+    live_publisher.notify(event_id)
+    _announce_promotions(promoted)
     
     flash('Registration cancelled successfully', 'info')
     return redirect(url_for('my_events'))
 
+# Upper bound on registrations cancelled by one bulk request
+BULK_CANCEL_LIMIT = 1000
+
+@app.route('/registrations/cancel/bulk', methods=['POST'])
+@login_required
+def bulk_cancel_registrations():
+    """Cancel many registrations in the admin's college at once, promoting from each waitlist in one pass."""
+    if current_user.role not in ['admin', 'staff']:
+        return jsonify({"error": "Access denied"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    ids = data.get('registration_ids')
+    if not isinstance(ids, list) or not ids:
+        return jsonify({"error": "Expected a non-empty 'registration_ids' list"}), 400
+    if len(ids) > BULK_CANCEL_LIMIT:
+        return jsonify({"error": f"At most {BULK_CANCEL_LIMIT} registrations per request"}), 413
+    try:
+        ids = {int(i) for i in ids}
+    except (TypeError, ValueError):
+        return jsonify({"error": "registration_ids must be integers"}), 400
+    
+    registrations = Registration.query.join(Event)\
+                                      .filter(Registration.id.in_(ids),
+                                              Event.college_id == current_user.college_id).all()
+    found = {r.id for r in registrations}
+    event_ids = {r.event_id for r in registrations}
+    cancelled, promoted = waitlist.cancel(registrations)
+    if cancelled:
+        DataVersion.bump('registrations', *event_ids)
+        DataVersion.bump('students', current_user.college_id)
+    db.session.commit()
+    
+    if cancelled:
+        revocations.expire()
+        report_cache.invalidate(current_user.college_id)
+        live_publisher.notify(*event_ids)
+        _announce_promotions(promoted)
+    
+    return jsonify({
+        "cancelled": cancelled,
+        "not_found": sorted(ids - found),
+        "promoted": {str(event_id): user_ids for event_id, user_ids in promoted.items()}
+    })
+
+def _announce_promotions(promoted):
+    """Push waitlist promotions to the promoted students' open pages, after the commit."""
+    if promoted:
+        titles = dict(db.session.query(Event.id, Event.title).filter(Event.id.in_(promoted)))
+        live_publisher.promoted(promoted, titles)
+
+def _checkin_with_ticket(ticket, notes=None):
+    """Record the check-in a verified ticket grants; returns its time, or None if already checked in.
+
+    The ticket vouches for the confirmed registration, so nothing is read first.
+    """
+    now = datetime.utcnow()
+    inserted = _insert_checkins([{"user_id": ticket.user_id, "event_id": ticket.event_id,
+                                  "notes": notes, "check_in_time": now}])
+    if not inserted:
+        db.session.rollback()
+        return None
+    EventStats.increment(ticket.event_id, check_in_count=1)
+    StudentActivity.increment(ticket.user_id, check_in_count=1)
+    DataVersion.bump('checkins', ticket.event_id)
+    DataVersion.bump('students', ticket.college_id)
+    db.session.commit()
+    report_cache.invalidate(ticket.college_id)
+    live_publisher.notify(ticket.event_id)
+    return now
+
 @app.route('/checkin/<int:event_id>', methods=['POST'])
 @login_required
 def checkin_event(event_id):
+    # The ticket rendered into the form proves the registration without a lookup
+    token = request.form.get('ticket')
+    if token:
+        try:
+            ticket = verify_ticket(token)
+        except TicketError as e:
+            flash(f'Your ticket is {e.reason}', 'error')
+            return redirect(url_for('my_events'))
+        if ticket.user_id != current_user.id or ticket.event_id != event_id:
+            flash('This ticket is for a different registration', 'error')
+            return redirect(url_for('my_events'))
+        if _checkin_with_ticket(ticket) is None:
+            flash('You have already checked in for this event', 'warning')
+        else:
+            flash('Successfully checked in!', 'success')
+        return redirect(url_for('my_events'))
+    
     # Check if user is registered for the event
     registration = Registration.query.filter_by(
         user_id=current_user.id, 
@@ -409,7 +846,13 @@ def checkin_event(event_id):
     )
     
     db.session.add(checkin)
+    EventStats.increment(event_id, check_in_count=1)
+    StudentActivity.increment(current_user.id, check_in_count=1)
+    DataVersion.bump('checkins', event_id)
+    DataVersion.bump('students', current_user.college_id)
     db.session.commit()
+    report_cache.invalidate(current_user.college_id)
+    live_publisher.notify(event_id)
     
     flash('Successfully checked in!', 'success')
     return redirect(url_for('my_events'))
@@ -417,6 +860,23 @@ def checkin_event(event_id):
 @app.route('/checkin', methods=['POST'])
 def checkin():
     data = request.get_json()
+
+    # Scanned ticket: verified from its signature alone
+    if data.get('ticket'):
+        try:
+            ticket = verify_ticket(data['ticket'])
+        except TicketError as e:
+            return jsonify({"error": f"Ticket {e.reason}"}), 400 if e.reason == 'invalid' else 403
+        checked_in_at = _checkin_with_ticket(ticket, data.get('notes'))
+        if checked_in_at is None:
+            return jsonify({"error": "User already checked in"}), 400
+        return jsonify({
+            "message": "Check-in successful",
+            "user_id": ticket.user_id,
+            "event_id": ticket.event_id,
+            "time": checked_in_at.strftime("%Y-%m-%d %H:%M:%S")
+        }), 201
+
     user_id = data.get('user_id')
     event_id = data.get('event_id')
     notes = data.get('notes')
@@ -434,7 +894,13 @@ def checkin():
 
     checkin = CheckIn(user_id=user_id, event_id=event_id, notes=notes)
     db.session.add(checkin)
+    EventStats.increment(event_id, check_in_count=1)
+    StudentActivity.increment(user_id, check_in_count=1)
+    DataVersion.bump('checkins', event_id)
+    DataVersion.bump('students', user.college_id)
     db.session.commit()
+    report_cache.invalidate(event.college_id)
+    live_publisher.notify(event_id)
 
     return jsonify({
         "message": "Check-in successful",
@@ -443,6 +909,153 @@ def checkin():
         "time": checkin.check_in_time.strftime("%Y-%m-%d %H:%M:%S")
     }), 201
 
+# Upper bound on scans accepted by one bulk check-in request
+BULK_CHECKIN_LIMIT = 1000
+
+def _insert_checkins(rows):
+    """Insert check-in rows, letting the unique constraint drop duplicates.
+
+    Returns the set of (user_id, event_id) pairs that were actually inserted.
+    """
+    if not rows:
+        return set()
+    
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+        stmt = insert(CheckIn).values(rows)\
+                              .on_conflict_do_nothing(index_elements=['user_id', 'event_id'])\
+                              .returning(CheckIn.user_id, CheckIn.event_id)
+        return {tuple(r) for r in db.session.execute(stmt)}
+    
+    # Other backends: one savepoint per row so a conflict only skips that row
+    inserted = set()
+    for row in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(CheckIn).values(**row))
+        except IntegrityError:
+            continue
+        inserted.add((row['user_id'], row['event_id']))
+    return inserted
+
+@app.route('/checkin/bulk', methods=['POST'])
+@login_required
+def bulk_checkin():
+    if current_user.role not in ['admin', 'staff']:
+        return jsonify({"error": "Access denied"}), 403
+    
+    data = request.get_json(silent=True) or {}
+    items = data.get('checkins')
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "Expected a non-empty 'checkins' list"}), 400
+    if len(items) > BULK_CHECKIN_LIMIT:
+        return jsonify({"error": f"At most {BULK_CHECKIN_LIMIT} check-ins per request"}), 413
+
+    # Parse scans, collapsing repeats within the batch onto the first occurrence
+    results = []
+    pending = {}
+    ticketed = set()
+    for item in items:
+        if isinstance(item, dict) and item.get('ticket'):
+            try:
+                ticket = verify_ticket(item['ticket'])
+            except TicketError as e:
+                results.append({"status": f"ticket_{e.reason}"})
+                continue
+            key = (ticket.user_id, ticket.event_id)
+            # A valid ticket for another college's event is not this gate's to admit
+            if ticket.college_id == current_user.college_id:
+                ticketed.add(key)
+        else:
+            try:
+                key = (int(item['user_id']), int(item['event_id']))
+            except (KeyError, TypeError, ValueError):
+                results.append({"status": "invalid"})
+                continue
+        result = {"user_id": key[0], "event_id": key[1]}
+        if key in pending:
+            result["status"] = "duplicate"
+        else:
+            pending[key] = (result, item.get('notes'))
+        results.append(result)
+
+    # Tickets vouch for themselves; one query validates every other pair against confirmed
+    # registrations for events in the scanning staff member's college
+    registered = set(ticketed)
+    unticketed = [key for key in pending if key not in ticketed]
+    if unticketed:
+        registered |= {tuple(r) for r in db.session.query(Registration.user_id, Registration.event_id)
+                                                   .join(Event, Event.id == Registration.event_id).filter(
+            tuple_(Registration.user_id, Registration.event_id).in_(unticketed),
+            Registration.status == 'confirmed',
+            Event.college_id == current_user.college_id
+        )}
+
+    now = datetime.utcnow()
+    rows = []
+    for key, (result, notes) in pending.items():
+        if key in registered:
+            rows.append({"user_id": key[0], "event_id": key[1], "notes": notes, "check_in_time": now})
+        else:
+            result["status"] = "not_registered"
+
+    inserted = _insert_checkins(rows)
+    for row in rows:
+        key = (row['user_id'], row['event_id'])
+        pending[key][0]["status"] = "ok" if key in inserted else "duplicate"
+
+    for event_id, count in Counter(event_id for _, event_id in inserted).items():
+        EventStats.increment(event_id, check_in_count=count)
+    for user_id, count in Counter(user_id for user_id, _ in inserted).items():
+        StudentActivity.increment(user_id, check_in_count=count)
+
+    event_ids = {event_id for _, event_id in inserted}
+    college_ids = []
+    if inserted:
+        college_ids = [college_id for (college_id,) in
+                       db.session.query(Event.college_id).filter(Event.id.in_(event_ids)).distinct()]
+        DataVersion.bump('checkins', *event_ids)
+        DataVersion.bump('students', *college_ids)
+    db.session.commit()
+
+    if inserted:
+        report_cache.invalidate(*college_ids)
+        live_publisher.notify(*event_ids)
+
+    summary = Counter(r["status"] for r in results)
+    return jsonify({"results": results, "summary": dict(summary)})
+
+# ------------------ Live Counters ------------------
+@app.route('/events/live')
+@login_required
+def live_counters():
+    """Server-Sent Events stream of counter changes for ``?ids=1,2,3`` in the user's college."""
+    try:
+        requested = {int(i) for i in request.args.get('ids', '').split(',') if i.strip()}
+    except ValueError:
+        return jsonify({"error": "ids must be comma-separated event ids"}), 400
+    if not requested or len(requested) > app.config['LIVE_MAX_EVENTS']:
+        return jsonify({"error": f"Pass between 1 and {app.config['LIVE_MAX_EVENTS']} event ids"}), 400
+
+    # Scoping and the initial counts are resolved now; the stream itself holds no DB session
+    event_ids = {event_id for (event_id,) in db.session.query(Event.id).filter(
+        Event.id.in_(requested), Event.college_id == current_user.college_id)}
+    subscription = live_publisher.subscribe(event_ids, current_user.id)
+    if subscription is None:
+        return jsonify({"error": "Too many live connections, try again later"}), 503
+    try:
+        initial = snapshot(event_ids)
+    except Exception:
+        live_publisher.unsubscribe(subscription)
+        raise
+
+    response = Response(stream(subscription, initial), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # The server closes the response when the client goes away, even before the first byte
+    response.call_on_close(lambda: live_publisher.unsubscribe(subscription))
+    return response
+
 # ------------------ Feedback Routes ------------------
 @app.route('/event/<int:event_id>/feedback', methods=['POST'])
 @login_required
@@ -463,77 +1076,105 @@ def submit_feedback(event_id):
         flash('You already submitted feedback for this event.', 'warning')
         return redirect(url_for('my_events'))
 
-    rating = int(request.form.get('rating'))
+    rating = request.form.get('rating', type=int)
+    if rating not in FeedbackSummary.RATINGS:
+        flash('Please choose a rating from 1 to 5.', 'error')
+        return redirect(url_for('my_events'))
     comment = request.form.get('comment', '')
 
-    feedback = Feedback(user_id=current_user.id, event_id=event_id, rating=rating, comment=comment)
+    feedback = Feedback(user_id=current_user.id, event_id=event_id, rating=rating, comment=comment,
+                        created_at=datetime.utcnow())
     db.session.add(feedback)
-    db.session.commit()
-    
+    try:
+        FeedbackSummary.record(event_id, rating, feedback.created_at)
+        DataVersion.bump('feedback', event_id)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        flash('You already submitted feedback for this event.', 'warning')
+        return redirect(url_for('my_events'))
+    report_cache.invalidate(event.college_id)
+
+    flash('Thank you for your feedback!', 'success')
+    return redirect(url_for('my_events'))
+
+def _feedback_summary_json(event_id, summary):
+    return {
+        "event_id": event_id,
+        "feedback_count": summary.feedback_count if summary else 0,
+        "average_rating": summary.average_rating if summary else None,
+        "histogram": summary.histogram if summary else {rating: 0 for rating in FeedbackSummary.RATINGS},
+        "last_submitted_at": summary.last_submitted_at.strftime("%Y-%m-%d %H:%M:%S")
+                             if summary and summary.last_submitted_at else None
+    }
+
+def _archived_feedback_summary(event_id):
+    """An unsaved FeedbackSummary rebuilt from an archived event's feedback rows in one aggregate query."""
+    buckets = [func.sum(db.case((FeedbackArchive.rating == rating, 1), else_=0))
+               for rating in FeedbackSummary.RATINGS]
+    count, rating_sum, *histogram, last_submitted_at = db.session.query(
+        func.count(FeedbackArchive.id), func.sum(FeedbackArchive.rating), *buckets,
+        func.max(FeedbackArchive.created_at)
+    ).filter(FeedbackArchive.event_id == event_id).one()
+    return FeedbackSummary(event_id=event_id, feedback_count=count, rating_sum=rating_sum or 0,
+                           last_submitted_at=last_submitted_at,
+                           **{f'rating_{rating}': n or 0 for rating, n in zip(FeedbackSummary.RATINGS, histogram)})
+
+def _event_version(tag, scope):
+    """ETag validator for a per-event payload; None, a 404, for an event neither hot nor archived."""
+    def validator(event_id):
+        if not _event_exists(event_id):
+            return None
+        return f"{tag}-{event_id}", DataVersion.current(scope, event_id)
+    return validator
+
+@app.route('/event/<int:event_id>/feedback/summary', methods=['GET'])
+@conditional(_event_version('feedback-summary', 'feedback'))
+def get_feedback_summary(event_id):
+    row = db.session.query(Event.id, FeedbackSummary)\
+                    .outerjoin(FeedbackSummary, FeedbackSummary.event_id == Event.id)\
+                    .filter(Event.id == event_id).first()
+    if row is None:
+        if not _is_archived(event_id):
+            abort(404)
+        return jsonify(_feedback_summary_json(event_id, _archived_feedback_summary(event_id)))
+    return jsonify(_feedback_summary_json(event_id, row[1]))
+
 @app.route('/event/<int:event_id>/feedback', methods=['GET'])
+@conditional(_event_version('feedback', 'feedback'))
 def get_feedback(event_id):
-    event = Event.query.get_or_404(event_id)
-    
-    feedbacks = Feedback.query.filter_by(event_id=event_id).all()
-    result = []
-    for f in feedbacks:
-        result.append({
-            "student_name": f.user.full_name,
-            "student_id": f.user.student_id,
-            "rating": f.rating,
-            "comment": f.comment,
-            "submitted_at": f.created_at.strftime("%Y-%m-%d %H:%M:%S")
-        })
+    title, archived = _event_title(event_id)
     
-    return jsonify({
-        "event": event.title,
-        "feedbacks": result
+    return json_response({
+        "event": title,
+        "feedbacks": (ARCHIVED_FEEDBACK if archived else FEEDBACK).rows(event_id)
     })
 
 @app.route('/event/<int:event_id>/registrations', methods=['GET'])
+@conditional(_event_version('registrations', 'registrations'))
 def get_total_registrations(event_id):
-    event = Event.query.get_or_404(event_id)
+    title, archived = _event_title(event_id)
     
-    total_registrations = Registration.query.filter_by(event_id=event_id).count()
-    
-    # Optional: get detailed list of students
-    registrations = Registration.query.filter_by(event_id=event_id).all()
-    students = []
-    for r in registrations:
-        students.append({
-            "student_name": r.user.full_name,
-            "student_id": r.user.student_id,
-            "status": r.status,
-            "registered_at": r.registered_at.strftime("%Y-%m-%d %H:%M:%S")
-        })
+    # The total comes from the same rows as the student list
+    students = (ARCHIVED_REGISTRATIONS if archived else REGISTRATIONS).rows(event_id)
     
-    return jsonify({
-        "event": event.title,
-        "total_registrations": total_registrations,
+    return json_response({
+        "event": title,
+        "total_registrations": len(students),
         "students": students
     })
 
+def _top_students_version():
+    college_id = request.args.get('college_id', type=int)
+    return f"top-students-{college_id or 'all'}", DataVersion.current('students', college_id)
+
 @app.route('/report/top_students', methods=['GET'])
+@conditional(_top_students_version)
 def get_top_students():
     # Optional: filter by college_id via query param
     college_id = request.args.get('college_id', type=int)
 
-    query = db.session.query(
-        User.id,
-        User.full_name,
-        User.student_id,
-        func.count(Registration.id).label('registration_count'),
-        func.count(CheckIn.id).label('checkin_count')
-    ).join(Registration, Registration.user_id == User.id)\
-     .outerjoin(CheckIn, CheckIn.user_id == User.id)\
-     .filter(User.role == 'student')
-
-    if college_id:
-        query = query.filter(User.college_id == college_id)
-    
-    top_students = query.group_by(User.id)\
-                        .order_by(desc('registration_count'), desc('checkin_count'))\
-                        .limit(5).all()  # Top 5 students
+    top_students = _top_students(college_id, limit=5)  # Top 5 students
     
     result = []
     for s in top_students:
@@ -546,6 +1187,91 @@ def get_top_students():
     
     return jsonify({"top_students": result})
 
+@app.route('/report/analytics')
+@login_required
+def get_attendance_analytics():
+    if current_user.role not in ['admin', 'staff']:
+        return jsonify({"error": "Access denied"}), 403
+
+    try:
+        analytics, start_date = _windowed_analytics(current_user.college_id,
+                                                    request.args.get('start_date', ''),
+                                                    request.args.get('end_date', ''))
+    except ValueError:
+        return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
+    return jsonify(dict(analytics, start_date=start_date))
+
+@app.route('/report/cache_stats')
+@login_required
+def report_cache_stats():
+    if current_user.role not in ['admin', 'staff']:
+        return jsonify({"error": "Access denied"}), 403
+    return jsonify(report_cache.stats())
+
+
+# Rows fetched per round trip when streaming exports
+EXPORT_CHUNK_SIZE = 1000
+
+def _registration_export_row(r):
+    return {
+        "registration_id": r.id,
+        "student_name": r.full_name,
+        "student_id": r.student_id,
+        "event_title": r.title,
+        "status": r.status,
+        "registered_at": r.registered_at.strftime("%Y-%m-%d %H:%M")
+    }
+
+def _stream_csv(rows, fieldnames):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    for i, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if i % EXPORT_CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def _stream_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+def _registrations_query(college_id, event_id=None, status='', start_date='', end_date=''):
+    """Registrations for a college with optional filters; raises ValueError on malformed dates.
+
+    Archived registrations are included (UNION ALL) when the date range reaches the archive.
+    """
+    start_dt = datetime.strptime(start_date, '%Y-%m-%d') if start_date else None
+    end_dt = datetime.strptime(end_date, '%Y-%m-%d') + timedelta(days=1) if end_date else None
+
+    def select_from(registration, event):
+        query = db.select(
+            registration.id,
+            User.full_name,
+            User.student_id,
+            event.title,
+            registration.status,
+            registration.registered_at
+        ).join(User, User.id == registration.user_id) \
+         .join(event, event.id == registration.event_id) \
+         .where(User.college_id == college_id)
+
+        if event_id:
+            query = query.where(registration.event_id == event_id)
+        if status:
+            query = query.where(registration.status == status)
+        if start_dt:
+            query = query.where(registration.registered_at >= start_dt)
+        if end_dt:
+            query = query.where(registration.registered_at < end_dt)
+        return query
+
+    query = select_from(Registration, Event)
+    if reaches_archive(start_dt):
+        query = db.select(db.union_all(query, select_from(RegistrationArchive, EventArchive)).subquery())
+    return query
 
 @app.route('/report/registrations')
 @login_required
@@ -553,51 +1279,158 @@ def report_registrations():
     if current_user.role not in ['admin', 'staff']:
         return jsonify({"error": "Access denied"}), 403
 
-    # Get all registrations for this college
-    registrations = db.session.query(
-        Registration.id,
-        User.full_name,
-        User.student_id,
-        Event.title,
-        Registration.status,
-        Registration.registered_at
-    ).join(User, User.id == Registration.user_id) \
-     .join(Event, Event.id == Registration.event_id) \
-     .filter(User.college_id == current_user.college_id) \
-     .all()
+    export_format = request.args.get('format', 'json')
+    if export_format not in ('json', 'csv', 'ndjson'):
+        return jsonify({"error": "format must be one of json, csv, ndjson"}), 400
 
-    result = []
-    for r in registrations:
-        result.append({
-            "registration_id": r.id,
-            "student_name": r.full_name,
-            "student_id": r.student_id,
-            "event_title": r.title,
-            "status": r.status,
-            "registered_at": r.registered_at.strftime("%Y-%m-%d %H:%M")
-        })
+    try:
+        query = _registrations_query(
+            current_user.college_id,
+            event_id=request.args.get('event_id', type=int),
+            status=request.args.get('status', ''),
+            start_date=request.args.get('start_date', ''),
+            end_date=request.args.get('end_date', '')
+        )
+    except ValueError:
+        return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
 
-    return jsonify(result)
+    if export_format == 'json':
+        return jsonify([_registration_export_row(r) for r in db.session.execute(query)])
+
+    # Streamed formats walk a server-side cursor in chunks so memory stays flat
+    query = query.order_by(query.selected_columns.id)\
+                 .execution_options(stream_results=True, yield_per=EXPORT_CHUNK_SIZE)
+
+    def rows():
+        for r in db.session.execute(query):
+            yield _registration_export_row(r)
+
+    if export_format == 'csv':
+        body = _stream_csv(rows(), ["registration_id", "student_name", "student_id",
+                                    "event_title", "status", "registered_at"])
+        mimetype = 'text/csv'
+    else:
+        body = _stream_ndjson(rows())
+        mimetype = 'application/x-ndjson'
+
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=registrations.{export_format}'
+    return response
 
 # Attendance Report Route
 @app.route('/report/attendance/<int:event_id>')
+@conditional(_event_version('attendance', 'checkins'))
 def report_attendance(event_id):
-    checkins = CheckIn.query.filter_by(event_id=event_id).all()
-    data = [
-        {
-            "user": c.user.full_name,
-            "check_in_time": c.check_in_time.strftime("%Y-%m-%d %H:%M:%S"),
-            "notes": c.notes
-        }
-        for c in checkins
-    ]
-    return jsonify(data)
+    rows = ATTENDANCE.rows(event_id)
+    # No hot rows may mean the event has been archived
+    if not rows and _is_archived(event_id):
+        rows = ARCHIVED_ATTENDANCE.rows(event_id)
+    return json_response(rows)
+
+def _is_archived(event_id):
+    return db.session.query(EventArchive.id).filter_by(id=event_id).scalar() is not None
+
+def _event_exists(event_id):
+    """Whether the event is in the hot or the archive table, in one query."""
+    return db.session.query(db.or_(db.exists().where(Event.id == event_id),
+                                   db.exists().where(EventArchive.id == event_id))).scalar()
+
+def _event_title(event_id):
+    """``(title, archived)`` for a hot or archived event; aborts with 404 when it is neither."""
+    title = db.session.query(Event.title).filter_by(id=event_id).scalar()
+    if title is not None:
+        return title, False
+    title = db.session.query(EventArchive.title).filter_by(id=event_id).scalar()
+    if title is None:
+        abort(404)
+    return title, True
+
+# ------------------ Background Report Jobs ------------------
+@job_kind('reports')
+def _reports_job(college_id, event_type='', start_date='', end_date=''):
+    return {
+        "events": _report_events(college_id, event_type, start_date, end_date),
+        "event_type_stats": _event_type_stats(college_id),
+        "top_students": [row._asdict() for row in _top_students(college_id, limit=3)]
+    }
+
+@job_kind('registrations')
+def _registrations_job(college_id, event_id=None, status='', start_date='', end_date=''):
+    query = _registrations_query(college_id, event_id, status, start_date, end_date)
+    return [_registration_export_row(r) for r in db.session.execute(query)]
+
+@job_kind('analytics')
+def _analytics_job(college_id, start_date='', end_date=''):
+    return _attendance_analytics(college_id, start_date, end_date)
+
+@job_kind('top_students')
+def _top_students_job(college_id, limit=5):
+    return [row._asdict() for row in _top_students(college_id, limit=limit)]
+
+def _job_json(job):
+    data = {
+        "job_id": job.id,
+        "kind": job.kind,
+        "params": json.loads(job.params),
+        "status": job.status,
+        "created_at": job.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "status_url": url_for('report_job_status', job_id=job.id)
+    }
+    if job.status == 'done':
+        data["result_url"] = url_for('report_job_result', job_id=job.id)
+    if job.status == 'failed':
+        data["error"] = job.error
+    return data
+
+def _college_job_or_404(job_id):
+    job = ReportJob.query.filter_by(id=job_id, college_id=current_user.college_id).first()
+    if job is None:
+        abort(404)
+    return job
+
+@app.route('/report/jobs', methods=['POST'])
+@login_required
+def create_report_job():
+    if current_user.role not in ['admin', 'staff']:
+        return jsonify({"error": "Access denied"}), 403
+
+    data = request.get_json(silent=True) or {}
+    params = data.get('params') or {}
+    if not isinstance(params, dict):
+        return jsonify({"error": "params must be an object"}), 400
+    try:
+        job, created = enqueue(data.get('kind'), current_user.college_id, params, current_user.id)
+    except ValueError as e:
+        return jsonify({"error": str(e), "kinds": sorted(JOB_KINDS)}), 400
+
+    # Identical requests share one computation
+    return jsonify(dict(_job_json(job), coalesced=not created)), 202
+
+@app.route('/report/jobs/<job_id>')
+@login_required
+def report_job_status(job_id):
+    if current_user.role not in ['admin', 'staff']:
+        return jsonify({"error": "Access denied"}), 403
+    return jsonify(_job_json(_college_job_or_404(job_id)))
+
+@app.route('/report/jobs/<job_id>/result')
+@login_required
+def report_job_result(job_id):
+    if current_user.role not in ['admin', 'staff']:
+        return jsonify({"error": "Access denied"}), 403
+
+    job = _college_job_or_404(job_id)
+    if job.status != 'done':
+        return jsonify(_job_json(job)), 409
 
+    response = Response(job.result, mimetype='application/json')
+    response.headers['Content-Disposition'] = f'attachment; filename={job.kind}-{job.id}.json'
+    return response
 
 
 @app.context_processor
 def inject_now():
-    return {'now': datetime.utcnow()}
+    return {'now': request_now()}
 
 
 @app.context_processor
@@ -0,0 +1,87 @@
+import re
+from sqlalchemy import or_, text
+from app import db
+from models import Event
+
+# Results returned for one search; ranked results are not cursor-paginated
+SEARCH_LIMIT = 50
+
+_FTS_SETUP = [
+    # External-content table: the index stores tokens only and reads text back from event
+    """CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5(
+        title, description, venue,
+        content='event', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS event_fts_ai AFTER INSERT ON event BEGIN
+        INSERT INTO event_fts(rowid, title, description, venue)
+        VALUES (new.id, new.title, new.description, new.venue);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS event_fts_ad AFTER DELETE ON event BEGIN
+        INSERT INTO event_fts(event_fts, rowid, title, description, venue)
+        VALUES ('delete', old.id, old.title, old.description, old.venue);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS event_fts_au AFTER UPDATE OF title, description, venue ON event BEGIN
+        INSERT INTO event_fts(event_fts, rowid, title, description, venue)
+        VALUES ('delete', old.id, old.title, old.description, old.venue);
+        INSERT INTO event_fts(rowid, title, description, venue)
+        VALUES (new.id, new.title, new.description, new.venue);
+    END""",
+]
+
+def fts_enabled():
+    return db.engine.dialect.name == 'sqlite'
+
+def init_event_search(conn=None):
+    """Create the FTS5 index and its sync triggers on SQLite, indexing existing events once.
+
+    Runs on ``conn`` when given, inside the caller's transaction.
+    """
+    if not fts_enabled():
+        return
+    if conn is None:
+        with db.engine.begin() as conn:
+            return init_event_search(conn)
+    exists = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'event_fts'"
+    )).first()
+    for statement in _FTS_SETUP:
+        conn.execute(text(statement))
+    if not exists:
+        conn.execute(text("INSERT INTO event_fts(event_fts) VALUES ('rebuild')"))
+
+def fts_query(terms):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    words = re.findall(r'\w+', terms)
+    return ' '.join(f'"{word}"*' for word in words)
+
+def search_events(query, terms, limit=SEARCH_LIMIT):
+    """Rank the events in ``query`` that match ``terms`` across title, description and venue.
+
+    ``query`` carries the caller's scoping (college, is_active, type), so
+    search sees exactly the events the listing would.
+    """
+    match = fts_query(terms)
+    if not match:
+        return []
+
+    if fts_enabled():
+        fts = text("SELECT rowid AS event_id, bm25(event_fts, 10.0, 1.0, 3.0) AS score "
+                   "FROM event_fts WHERE event_fts MATCH :match")\
+            .bindparams(match=match)\
+            .columns(event_id=db.Integer, score=db.Float)\
+            .subquery('fts')
+        return query.join(fts, fts.c.event_id == Event.id)\
+                    .order_by(fts.c.score, Event.start_time)\
+                    .limit(limit).all()
+
+    return like_search(query, terms, limit)
+
+def like_search(query, terms, limit=SEARCH_LIMIT):
+    """Substring fallback for backends without FTS5; scans every scoped event row."""
+    for word in re.findall(r'\w+', terms):
+        pattern = f'%{word}%'
+        query = query.filter(or_(Event.title.ilike(pattern),
+                                 Event.description.ilike(pattern),
+                                 Event.venue.ilike(pattern)))
+    return query.order_by(Event.start_time).limit(limit).all()
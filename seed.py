@@ -0,0 +1,177 @@
+import random
+import time
+from datetime import datetime, timedelta
+import click
+from werkzeug.security import generate_password_hash
+from app import app, db
+from models import College, User, Event, EventArchive, EventStats, StudentActivity, Registration, CheckIn, Feedback, FeedbackSummary, DataVersion
+
+# Rows per executemany round trip
+BATCH_SIZE = 10000
+
+# Every seeded account shares this password so benchmarks can log in as anyone
+SEED_PASSWORD = 'password'
+
+EVENT_TYPES = ['hackathon', 'workshop', 'tech_talk', 'fest', 'seminar', 'competition', 'conference']
+DEPARTMENTS = ['Computer Science', 'Electrical Engineering', 'Mechanical Engineering',
+               'Civil Engineering', 'Mathematics', 'Physics', 'Business']
+VENUES = ['Main Auditorium', 'Lab Block A', 'Seminar Hall 2', 'Open Air Theatre', 'Library Annex']
+TOPICS = ['Machine Learning', 'Web Development', 'Robotics', 'Cloud Computing', 'Data Science',
+          'Cyber Security', 'Entrepreneurship', 'Design Thinking', 'Open Source', 'IoT']
+
+class BulkWriter:
+    """Buffers rows per model and flushes them with executemany inserts.
+
+    Buffers are flushed together in first-seen order, so parents (colleges,
+    users, events) always land before the rows that reference them.
+    """
+
+    def __init__(self):
+        self.buffers = {}
+        self.totals = {}
+
+    def add(self, model, row):
+        buffer = self.buffers.setdefault(model, [])
+        buffer.append(row)
+        if len(buffer) >= BATCH_SIZE:
+            self.flush()
+
+    def flush(self, model=None):
+        models = [model] if model else list(self.buffers)
+        for m in models:
+            rows = self.buffers.get(m)
+            if rows:
+                db.session.execute(db.insert(m), rows)
+                self.totals[m.__name__] = self.totals.get(m.__name__, 0) + len(rows)
+                rows.clear()
+        db.session.commit()
+
+def _next_id(model, *archives):
+    """First id above every row of ``model`` and its archive tables, so seeding never reuses an archived id."""
+    return max(db.session.query(db.func.max(m.id)).scalar() or 0 for m in (model, *archives)) + 1
+
+def _advance_sequences(inserted):
+    """Move PostgreSQL's id sequences past the ``{model: range of ids}`` seeding inserted explicitly.
+
+    SQLite and MySQL advance their counters on explicit ids; PostgreSQL's
+    serial sequences do not, and the next ORM insert would collide.
+    """
+    if db.engine.dialect.name != 'postgresql':
+        return
+    quote = db.engine.dialect.identifier_preparer.quote
+    for model, ids in inserted.items():
+        if ids:
+            db.session.execute(db.text("SELECT setval(pg_get_serial_sequence(:table, 'id'), :last_id)"),
+                               {"table": quote(model.__tablename__), "last_id": ids[-1]})
+
+def seed_campus(colleges=5, events=2000, students=100000, registrations=1000000,
+                checkin_rate=0.7, feedback_rate=0.4, seed=42):
+    """Generate a synthetic multi-college dataset with bulk inserts.
+
+    Events spread a year either side of now; past events get check-ins for
+    ``checkin_rate`` of confirmed registrations and feedback for
+    ``feedback_rate`` of check-ins. Returns row counts per table.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    password_hash = generate_password_hash(SEED_PASSWORD, app.config['PASSWORD_HASH_METHOD'])
+    writer = BulkWriter()
+
+    college_id = _next_id(College)
+    user_id = first_user = _next_id(User)
+    event_id = first_event = _next_id(Event, EventArchive)
+
+    for c in range(colleges):
+        cid = college_id + c
+        code = f'SYN{cid}'
+        writer.add(College, {"id": cid, "name": f"Synthetic College {cid}", "code": code,
+                             "address": f"{cid} Campus Road", "created_at": now})
+        writer.flush(College)
+
+        admin_id = user_id
+        writer.add(User, {"id": admin_id, "username": f"admin_{code.lower()}",
+                          "email": f"admin@{code.lower()}.edu", "password_hash": password_hash,
+                          "full_name": f"Admin {code}", "role": "admin", "college_id": cid,
+                          "created_at": now, "is_active": True})
+        user_id += 1
+
+        # Students
+        n_students = students // colleges + (1 if c < students % colleges else 0)
+        student_ids = list(range(user_id, user_id + n_students))
+        for i, sid in enumerate(student_ids):
+            writer.add(User, {"id": sid, "username": f"student_{code.lower()}_{i}",
+                              "email": f"student{i}@{code.lower()}.edu", "password_hash": password_hash,
+                              "full_name": f"Student {code} {i}", "role": "student", "college_id": cid,
+                              "student_id": f"{code}{i:06d}", "department": rng.choice(DEPARTMENTS),
+                              "year_of_study": rng.randint(1, 4), "created_at": now, "is_active": True})
+        user_id += n_students
+        writer.flush(User)
+
+        # Events and their registrations, check-ins and feedback
+        n_events = events // colleges + (1 if c < events % colleges else 0)
+        per_event = registrations // max(events, 1)
+        for _ in range(n_events):
+            eid = event_id
+            event_id += 1
+            start = now + timedelta(days=rng.uniform(-365, 365))
+            capacity = rng.choice([None, 50, 100, 200, 500, 1000])
+            writer.add(Event, {"id": eid, "title": f"{rng.choice(TOPICS)} {rng.choice(EVENT_TYPES).replace('_', ' ').title()} #{eid}",
+                               "description": f"Synthetic event {eid} about {rng.choice(TOPICS)}.",
+                               "event_type": rng.choice(EVENT_TYPES), "venue": rng.choice(VENUES),
+                               "start_time": start, "end_time": start + timedelta(hours=rng.choice([1, 2, 3, 8, 24])),
+                               "max_participants": capacity, "registration_deadline": start - timedelta(days=1),
+                               "college_id": cid, "created_by": admin_id,
+                               "created_at": start - timedelta(days=rng.uniform(7, 60)),
+                               "is_active": rng.random() > 0.05, "requires_approval": False})
+
+            n_regs = min(len(student_ids), max(0, int(rng.gauss(per_event, per_event * 0.3))))
+            attendees = rng.sample(student_ids, n_regs) if n_regs else []
+            confirmed = 0
+            for sid in attendees:
+                if capacity and confirmed >= capacity:
+                    status = 'waitlist'
+                elif rng.random() < 0.05:
+                    status = 'cancelled'
+                else:
+                    status = 'confirmed'
+                    confirmed += 1
+                registered_at = start - timedelta(days=rng.uniform(1, 30))
+                writer.add(Registration, {"user_id": sid, "event_id": eid, "status": status,
+                                          "registered_at": registered_at})
+
+                if status != 'confirmed' or start > now or rng.random() >= checkin_rate:
+                    continue
+                writer.add(CheckIn, {"user_id": sid, "event_id": eid,
+                                     "check_in_time": start + timedelta(minutes=rng.uniform(-15, 45))})
+                if rng.random() < feedback_rate:
+                    writer.add(Feedback, {"user_id": sid, "event_id": eid, "rating": rng.choices(
+                                              [1, 2, 3, 4, 5], weights=[1, 2, 4, 6, 4])[0],
+                                          "comment": None, "created_at": start + timedelta(hours=rng.uniform(2, 72))})
+    writer.flush()
+    _advance_sequences({College: range(college_id, college_id + colleges),
+                        User: range(first_user, user_id), Event: range(first_event, event_id)})
+
+    # Counter and rollup rows are derived from the inserted data
+    EventStats.backfill()
+    StudentActivity.backfill()
+    FeedbackSummary.backfill()
+    # New colleges change the all-college leaderboard its validators cover
+    DataVersion.bump('students', *range(college_id, college_id + colleges))
+    db.session.commit()
+    return writer.totals
+
+@app.cli.command('seed-campus')
+@click.option('--colleges', default=5, show_default=True)
+@click.option('--events', default=2000, show_default=True, help='Total events across all colleges.')
+@click.option('--students', default=100000, show_default=True, help='Total students across all colleges.')
+@click.option('--registrations', default=1000000, show_default=True, help='Approximate total registrations.')
+@click.option('--checkin-rate', default=0.7, show_default=True)
+@click.option('--feedback-rate', default=0.4, show_default=True)
+@click.option('--seed', default=42, show_default=True, help='Random seed, for reproducible datasets.')
+def seed_campus_command(colleges, events, students, registrations, checkin_rate, feedback_rate, seed):
+    """Fill the database with a synthetic campus dataset."""
+    started = time.perf_counter()
+    totals = seed_campus(colleges, events, students, registrations, checkin_rate, feedback_rate, seed)
+    for table, count in totals.items():
+        click.echo(f'{table:<14} {count:>10,}')
+    click.echo(f'Seeded in {time.perf_counter() - started:.1f}s (password for every account: {SEED_PASSWORD})')
@@ -0,0 +1,169 @@
+import calendar
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+import click
+from sqlalchemy.exc import IntegrityError
+from app import app, db, report_cache
+from models import Event, EventSeries, EventStats, SeriesOccurrence
+from upcoming import upcoming_index
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = ('daily', 'weekly', 'monthly')
+
+# materialized_until for a series with no occurrences left, so the window scan skips it for good
+FULLY_MATERIALIZED = datetime(9999, 12, 31)
+
+# Fields an edit copies from the series onto its future occurrences; is_active is only
+# copied when the edit changes it, so occurrences deactivated one by one stay that way
+PROPAGATED_FIELDS = ('title', 'description', 'event_type', 'venue', 'max_participants')
+
+def _add_months(value, months):
+    """Same day and time ``months`` later, or None when that month is too short for the day."""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    if value.day > calendar.monthrange(year, month)[1]:
+        return None
+    return value.replace(year=year, month=month)
+
+def occurrence_starts(series, after=None, through=None):
+    """Start times the rule produces in ``(after, through]``, honouring the count/until limits."""
+    step = {'daily': timedelta(days=series.interval),
+            'weekly': timedelta(weeks=series.interval)}.get(series.frequency)
+
+    # Daily/weekly rules can jump straight to the window instead of walking from the first start;
+    # k is the rule slot and n the occurrence number (they differ only when monthly skips short months)
+    k = n = 0
+    if step is not None and after is not None and after > series.first_start:
+        k = n = int((after - series.first_start) / step)
+
+    while True:
+        if series.occurrence_limit is not None and n >= series.occurrence_limit:
+            return
+        if step is not None:
+            start = series.first_start + k * step
+        else:
+            start = _add_months(series.first_start, k * series.interval)
+        k += 1
+        if start is None:
+            continue
+        n += 1
+        if (series.until is not None and start > series.until) or (through is not None and start > through):
+            return
+        if after is None or start > after:
+            yield start
+
+def is_finite(series):
+    return series.occurrence_limit is not None or series.until is not None
+
+def _occurrence_row(series, start):
+    deadline = None
+    if series.registration_lead_minutes is not None:
+        deadline = start - timedelta(minutes=series.registration_lead_minutes)
+    return {"title": series.title, "description": series.description, "event_type": series.event_type,
+            "venue": series.venue, "max_participants": series.max_participants,
+            "start_time": start, "end_time": start + timedelta(minutes=series.duration_minutes),
+            "registration_deadline": deadline, "college_id": series.college_id,
+            "created_by": series.created_by, "is_active": series.is_active}
+
+def _insert_occurrences(series, starts):
+    """Insert the events, their stats rows and the series links in three executemany statements.
+
+    The event insert hands back each new row's id with its start time
+    (RETURNING), which is unique within the series. Asking for the rows in
+    parameter order instead would make SQLite insert them one at a time.
+    """
+    ids = dict(db.session.execute(
+        db.insert(Event).returning(Event.start_time, Event.id),
+        [_occurrence_row(series, start) for start in starts]
+    ).all())
+    db.session.execute(db.insert(EventStats), [
+        {"event_id": ids[start], "confirmed_count": 0, "check_in_count": 0} for start in starts
+    ])
+    db.session.execute(db.insert(SeriesOccurrence), [
+        {"series_id": series.id, "starts_at": start, "event_id": ids[start]} for start in starts
+    ])
+
+def materialize(series, through=None):
+    """Create the occurrences starting up to ``through``, or every remaining one when it is None.
+
+    The events are inserted in bulk and committed together with the new
+    ``materialized_until``. If another worker materialized the same slots
+    first, the primary key on series_occurrence rejects ours and we keep
+    theirs. Returns the number of events created.
+    """
+    if through is None and not is_finite(series):
+        raise ValueError('An open-ended series can only be materialized up to a date')
+    starts = list(occurrence_starts(series, after=series.materialized_until, through=through))
+    horizon = through
+    if through is None or next(occurrence_starts(series, after=through), None) is None:
+        horizon = FULLY_MATERIALIZED
+
+    try:
+        if starts:
+            _insert_occurrences(series, starts)
+        series.materialized_until = horizon
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        logger.info('Series %s was materialized concurrently; keeping the existing occurrences', series.id)
+        return 0
+
+    if starts:
+        report_cache.invalidate(series.college_id)
+        upcoming_index.invalidate(series.college_id)
+    return len(starts)
+
+def window_end():
+    return datetime.utcnow() + timedelta(days=app.config['SERIES_HORIZON_DAYS'])
+
+def materialize_due(college_id=None):
+    """Extend every active series whose materialized occurrences fall short of the rolling window."""
+    horizon = window_end()
+    query = EventSeries.query.filter(
+        EventSeries.is_active == True,
+        db.or_(EventSeries.materialized_until.is_(None), EventSeries.materialized_until < horizon)
+    )
+    if college_id is not None:
+        query = query.filter(EventSeries.college_id == college_id)
+
+    created = 0
+    for series in query.all():
+        created += materialize(series, horizon)
+    return created
+
+_last_checked = {}
+_check_lock = threading.Lock()
+
+def ensure_materialized(college_id):
+    """Cheap per-request hook: top up a college's series at most every SERIES_CHECK_INTERVAL seconds."""
+    now = time.monotonic()
+    with _check_lock:
+        if now - _last_checked.get(college_id, float('-inf')) < app.config['SERIES_CHECK_INTERVAL']:
+            return
+        _last_checked[college_id] = now
+    materialize_due(college_id)
+
+def propagate(series, fields=PROPAGATED_FIELDS):
+    """Copy ``fields`` of the series onto its future occurrences in one UPDATE; past ones keep their history.
+
+    Returns the ids of the events changed. The caller refills their seats from
+    the waitlists and bumps their data versions.
+    """
+    future = db.select(SeriesOccurrence.event_id).where(
+        SeriesOccurrence.series_id == series.id,
+        SeriesOccurrence.starts_at > datetime.utcnow()
+    )
+    values = {field: getattr(series, field) for field in fields}
+    return db.session.execute(
+        db.update(Event).where(Event.id.in_(future)).values(**values)
+                        .returning(Event.id)
+                        .execution_options(synchronize_session=False)
+    ).scalars().all()
+
+@app.cli.command('materialize-series')
+def materialize_series_command():
+    """Create upcoming occurrences for every active series (run from cron)."""
+    click.echo(f'{materialize_due()} occurrences created')
@@ -50,12 +50,8 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
-    // Auto-refresh for ongoing events (every 30 seconds)
-    if (window.location.pathname.includes('/dashboard') || window.location.pathname.includes('/events')) {
-        setInterval(function() {
-            updateEventStatuses();
-        }, 30000);
-    }
+    // Live registration/check-in counters pushed by the server (replaces 30 second polling)
+    subscribeLiveCounters();
 
     // Dynamic form field visibility
     setupDynamicFormFields();
@@ -114,6 +110,65 @@ function updateEventStatuses() {
     });
 }
 
+function subscribeLiveCounters() {
+    const elements = document.querySelectorAll('[data-event-id]');
+    if (elements.length === 0 || typeof EventSource === 'undefined') {
+        return;
+    }
+
+    const ids = Array.from(new Set(Array.from(elements, el => el.dataset.eventId)));
+    const source = new EventSource('/events/live?ids=' + ids.join(','));
+
+    source.addEventListener('counts', function(e) {
+        applyLiveCounts(JSON.parse(e.data));
+    });
+
+    // Sent only to the student whose waitlist entry just became a confirmed seat
+    source.addEventListener('promoted', function(e) {
+        applyPromotion(JSON.parse(e.data));
+    });
+
+    // The server's keepalive doubles as the tick for time-based status badges
+    source.addEventListener('ping', function() {
+        updateEventStatuses();
+    });
+
+    window.addEventListener('beforeunload', function() {
+        source.close();
+    });
+}
+
+function applyLiveCounts(counts) {
+    document.querySelectorAll(`[data-event-id="${counts.id}"]`).forEach(function(container) {
+        container.querySelectorAll('[data-live="registered"]').forEach(function(el) {
+            el.textContent = counts.registered;
+        });
+        container.querySelectorAll('[data-live="checked_in"]').forEach(function(el) {
+            el.textContent = counts.checked_in;
+        });
+
+        // Registering for a full event joins the waitlist, so relabel the button to match
+        const button = container.querySelector('[data-live="register-button"]');
+        if (button) {
+            button.classList.toggle('btn-primary', !counts.full);
+            button.classList.toggle('btn-outline-warning', counts.full);
+            button.innerHTML = counts.full
+                ? '<i class="bi bi-hourglass-split me-2"></i>Event Full - Join Waitlist'
+                : '<i class="bi bi-person-plus me-2"></i>Register Now';
+        }
+    });
+}
+
+function applyPromotion(promotion) {
+    document.querySelectorAll(`[data-event-id="${promotion.id}"] [data-live="waitlist-button"]`).forEach(function(button) {
+        button.classList.replace('btn-info', 'btn-success');
+        button.innerHTML = '<i class="bi bi-check-circle me-2"></i>Registered';
+    });
+    const title = document.createElement('strong');
+    title.textContent = promotion.title || 'an event';
+    showNotification(`A seat opened up: you are now registered for ${title.outerHTML}.`, 'success');
+}
+
 function setupDynamicFormFields() {
     // Role-based field visibility in registration form
     const roleSelect = document.getElementById('role');
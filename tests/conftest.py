@@ -0,0 +1,80 @@
+import itertools
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+# The app binds its database at import time, so point it at a scratch file first
+_fd, _db_path = tempfile.mkstemp(suffix='.db')
+os.close(_fd)
+os.environ['DATABASE_URL'] = 'sqlite:///' + _db_path
+os.environ.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app, db  # noqa: E402
+from models import College, Event, Registration, User  # noqa: E402
+
+flask_app.config['TESTING'] = True
+_names = itertools.count(1)
+
+def pytest_sessionfinish(session, exitstatus):
+    os.unlink(_db_path)
+
+def _save(row):
+    """Commit ``row`` in its own app context and hand it back detached, like a row a request has finished with."""
+    with flask_app.app_context():
+        db.session.add(row)
+        db.session.commit()
+        db.session.refresh(row)
+        db.session.expunge(row)
+    return row
+
+@pytest.fixture
+def app():
+    """The app, without a context pushed: requests get their own sessions, and tests open
+    ``app.app_context()`` for their own reads, as separate workers would."""
+    return flask_app
+
+@pytest.fixture
+def make_user(app):
+    def make(role='student', college_id=1, **fields):
+        name = f'{role}{next(_names)}'
+        return _save(User(username=name, email=f'{name}@example.edu', password_hash='', full_name=name.title(),
+                          role=role, college_id=college_id, **fields))
+    return make
+
+@pytest.fixture
+def make_event(app):
+    def make(start=None, hours=2, college_id=1, **fields):
+        start = start or datetime.utcnow() + timedelta(days=2)
+        fields.setdefault('title', f'Event {next(_names)}')
+        fields.setdefault('event_type', 'workshop')
+        return _save(Event(start_time=start, end_time=start + timedelta(hours=hours), college_id=college_id,
+                           created_by=1, **fields))
+    return make
+
+@pytest.fixture
+def make_college(app):
+    def make():
+        number = next(_names)
+        return _save(College(name=f'College {number}', code=f'C{number}'))
+    return make
+
+@pytest.fixture
+def make_registration(app):
+    def make(user, event, status='confirmed'):
+        return _save(Registration(user_id=user.id, event_id=event.id, status=status))
+    return make
+
+@pytest.fixture
+def client_for(app):
+    """A test client already logged in as ``user`` (the Flask-Login session, without a password round trip)."""
+    def make(user):
+        client = flask_app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+        return client
+    return make
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from app import db
+from analytics import attendance_analytics, sql_breakdowns
+from models import CheckIn
+
+def _attended_event(app, college, make_user, make_event, make_registration, days_ago, attended, no_shows):
+    event = make_event(start=datetime.utcnow() - timedelta(days=days_ago), college_id=college.id,
+                       event_type='hackathon' if days_ago > 100 else 'workshop')
+    for i in range(attended + no_shows):
+        student = make_user(college_id=college.id, department=['CS', 'EE'][i % 2], year_of_study=1 + i % 3)
+        make_registration(student, event)
+        if i < attended:
+            with app.app_context():
+                db.session.add(CheckIn(user_id=student.id, event_id=event.id))
+                db.session.commit()
+    return event
+
+def test_reports_default_to_a_bounded_window(app, make_college, make_user, make_event, make_registration,
+                                             client_for):
+    college = make_college()
+    _attended_event(app, college, make_user, make_event, make_registration, days_ago=10, attended=3, no_shows=1)
+    _attended_event(app, college, make_user, make_event, make_registration, days_ago=200, attended=1, no_shows=1)
+    staff = client_for(make_user(role='staff', college_id=college.id))
+
+    recent = staff.get('/report/analytics').get_json()
+    assert recent["summary"]["events"] == 1
+    assert recent["summary"]["attendance_rate"] == 75.0
+
+    full = staff.get('/report/analytics?start_date=2000-01-01').get_json()
+    assert full["summary"] == {"events": 2, "confirmed": 6, "attended": 4,
+                               "attendance_rate": 66.7, "no_show_rate": 33.3}
+
+    page = staff.get('/admin/reports')
+    assert page.status_code == 200
+    assert f'since {recent["start_date"]}' in page.get_data(as_text=True)
+
+def test_breakdowns_match_sql(app, make_college, make_user, make_event, make_registration):
+    college = make_college()
+    for days_ago, attended, no_shows in ((3, 2, 2), (20, 4, 1), (150, 0, 3)):
+        _attended_event(app, college, make_user, make_event, make_registration, days_ago, attended, no_shows)
+
+    with app.app_context():
+        engine = attendance_analytics(college.id)["breakdowns"]
+        for dimension, rows in sql_breakdowns(college.id).items():
+            assert engine[dimension] == rows
@@ -0,0 +1,96 @@
+import os
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timedelta
+
+from app import db
+from archive import archive_events
+from models import Event, EventArchive
+
+def test_zero_days_archives_every_finished_event(app, make_event):
+    finished = make_event(start=datetime.utcnow() - timedelta(hours=3))
+    running = make_event(start=datetime.utcnow() - timedelta(hours=1))
+    with app.app_context():
+        assert archive_events(older_than_days=0) >= 1
+        assert db.session.get(EventArchive, finished.id) is not None
+        assert db.session.get(Event, running.id) is not None
+
+def test_archived_ids_are_not_handed_out_again(app, make_event):
+    long_ago = datetime.utcnow() - timedelta(days=400)
+    with app.app_context():
+        archive_events(older_than_days=0)
+    newest = make_event(start=long_ago)
+    with app.app_context():
+        assert archive_events(older_than_days=0) == 1
+
+    # The newest event is gone from the hot table; the next one must not take its id
+    again = make_event(start=long_ago)
+    assert again.id > newest.id
+    with app.app_context():
+        assert archive_events(older_than_days=0) == 1
+        archived = EventArchive.query.filter(EventArchive.id.in_([newest.id, again.id])).count()
+        assert archived == 2
+
+_LEGACY_START = """
+import sqlite3, sys
+db = sqlite3.connect(sys.argv[1])
+# Recreate the event table the way it was declared before AUTOINCREMENT
+ddl, = db.execute("SELECT sql FROM sqlite_master WHERE name = 'event'").fetchone()
+db.executescript(
+    "DROP TABLE event;" + ddl.replace(' AUTOINCREMENT', '') + ";"
+    "INSERT INTO event (id, title, event_type, start_time, end_time, college_id, created_by) VALUES"
+    " (1, 'Kept', 'workshop', '2020-01-01', '2020-01-01', 1, 1),"
+    " (2, 'Archived', 'workshop', '2020-01-02', '2020-01-02', 1, 1);"
+    "INSERT INTO event_archive (id, title, event_type, start_time, end_time, college_id, created_by,"
+    " confirmed_count, check_in_count, feedback_count, rating_sum, archived_at)"
+    " SELECT id, title, event_type, start_time, end_time, college_id, created_by, 0, 0, 0, 0, start_time"
+    " FROM event WHERE id = 2;"
+    "DELETE FROM event WHERE id = 2;"
+)
+"""
+
+_RESTART = """
+import sys
+from datetime import datetime
+from app import app, db
+from models import Event
+with app.app_context():
+    event = Event(title='New', event_type='workshop', start_time=datetime.utcnow(), end_time=datetime.utcnow(),
+                  college_id=1, created_by=1)
+    db.session.add(event)
+    db.session.commit()
+    print(event.id)
+"""
+
+def test_upgrade_command_rebuilds_legacy_sqlite_tables(tmp_path):
+    path = tmp_path / 'legacy.db'
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{path}')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    def run(script, *args):
+        return subprocess.run([sys.executable, '-c', script, *args], env=env, cwd=root, check=True,
+                              capture_output=True, text=True).stdout
+    def flask(*args):
+        return subprocess.run([sys.executable, '-m', 'flask', '--app', 'main.py', *args], env=env, cwd=root,
+                              capture_output=True, text=True)
+    def event_ddl():
+        return sqlite3.connect(path).execute("SELECT sql FROM sqlite_master WHERE name = 'event'").fetchone()[0]
+
+    run('import app')
+    run(_LEGACY_START, str(path))
+
+    # Starting the app leaves the schema alone, and archiving refuses until the upgrade has run
+    run('import app')
+    assert 'AUTOINCREMENT' not in event_ddl()
+    refused = flask('archive-events')
+    assert refused.returncode != 0 and 'upgrade-archive-ids' in refused.stderr
+
+    assert 'Rebuilt event' in flask('upgrade-archive-ids').stdout
+    assert 'already' in flask('upgrade-archive-ids').stdout
+    assert run(_RESTART).strip() == '3'
+
+    assert 'AUTOINCREMENT' in event_ddl()
+    connection = sqlite3.connect(path)
+    objects = {name for name, in connection.execute("SELECT name FROM sqlite_master WHERE tbl_name = 'event'")}
+    assert {'idx_event_college_type', 'event_fts_ai'} <= objects
+    assert connection.execute("SELECT title FROM event ORDER BY id").fetchall() == [('Kept',), ('New',)]
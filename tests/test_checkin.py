@@ -0,0 +1,40 @@
+from app import db
+from models import CheckIn
+from tickets import issue_ticket
+
+def _checked_in(event_id):
+    return {user_id for user_id, in db.session.query(CheckIn.user_id).filter_by(event_id=event_id)}
+
+def test_bulk_checkin_requires_staff(app, make_user, make_event, make_registration, client_for):
+    student = make_user()
+    event = make_event()
+    make_registration(student, event)
+    payload = {"checkins": [{"user_id": student.id, "event_id": event.id}]}
+
+    assert app.test_client().post('/checkin/bulk', json=payload).status_code == 302
+    assert client_for(student).post('/checkin/bulk', json=payload).status_code == 403
+    with app.app_context():
+        assert _checked_in(event.id) == set()
+
+def test_bulk_checkin_only_admits_own_college(app, make_college, make_user, make_event, make_registration,
+                                              client_for):
+    other = make_college()
+    home_student, away_student = make_user(), make_user(college_id=other.id)
+    home_event, away_event = make_event(), make_event(college_id=other.id)
+    make_registration(home_student, home_event)
+    away_registration = make_registration(away_student, away_event)
+    with app.app_context():
+        away_ticket = issue_ticket(away_registration, away_event)
+
+    staff = client_for(make_user(role='staff'))
+    response = staff.post('/checkin/bulk', json={"checkins": [
+        {"user_id": home_student.id, "event_id": home_event.id},
+        {"user_id": away_student.id, "event_id": away_event.id},
+    ]})
+    assert [r["status"] for r in response.get_json()["results"]] == ["ok", "not_registered"]
+
+    response = staff.post('/checkin/bulk', json={"checkins": [{"ticket": away_ticket}]})
+    assert [r["status"] for r in response.get_json()["results"]] == ["not_registered"]
+    with app.app_context():
+        assert _checked_in(home_event.id) == {home_student.id}
+        assert _checked_in(away_event.id) == set()
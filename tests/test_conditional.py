@@ -0,0 +1,25 @@
+from email.utils import formatdate
+
+import pytest
+
+PER_EVENT_URLS = ['/event/{}/registrations', '/report/attendance/{}', '/event/{}/feedback',
+                  '/event/{}/feedback/summary']
+
+@pytest.mark.parametrize('url', PER_EVENT_URLS)
+def test_unknown_event_is_404_even_with_a_matching_etag(app, url):
+    response = app.test_client().get(url.format(999999), headers={'If-None-Match': '*'})
+    assert response.status_code == 404
+
+def test_write_in_the_same_second_is_not_answered_with_304(app, make_user, make_event, client_for):
+    event = make_event()
+    client = app.test_client()
+    first = client.get(f'/event/{event.id}/registrations')
+    assert first.status_code == 200 and first.headers.get('Last-Modified') is None
+    etag = first.headers['ETag']
+    assert client.get(f'/event/{event.id}/registrations', headers={'If-None-Match': etag}).status_code == 304
+
+    client_for(make_user()).post(f'/register_event/{event.id}')
+    now = formatdate(usegmt=True)
+    fresh = client.get(f'/event/{event.id}/registrations', headers={'If-None-Match': etag, 'If-Modified-Since': now})
+    assert fresh.status_code == 200 and fresh.get_json()["total_registrations"] == 1
+    assert client.get(f'/event/{event.id}/registrations', headers={'If-Modified-Since': now}).status_code == 200
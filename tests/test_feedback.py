@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+
+from app import db
+from archive import archive_events
+from models import Feedback, FeedbackSummary
+
+def test_feedback_summary_survives_archiving(app, make_user, make_event):
+    event = make_event(start=datetime.utcnow() - timedelta(days=400))
+    students = [make_user() for _ in range(3)]
+    with app.app_context():
+        for student, rating in zip(students, (5, 4, 4)):
+            submitted_at = datetime.utcnow()
+            db.session.add(Feedback(user_id=student.id, event_id=event.id, rating=rating, created_at=submitted_at))
+            FeedbackSummary.record(event.id, rating, submitted_at)
+        db.session.commit()
+
+    client = app.test_client()
+    hot = client.get(f'/event/{event.id}/feedback/summary').get_json()
+    assert hot["feedback_count"] == 3 and hot["histogram"]["4"] == 2
+
+    with app.app_context():
+        assert archive_events(older_than_days=30) >= 1
+    assert client.get(f'/event/{event.id}/feedback/summary').get_json() == hot
+
+def test_feedback_summary_of_unknown_event_is_404(app):
+    assert app.test_client().get('/event/999999/feedback/summary').status_code == 404
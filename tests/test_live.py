@@ -0,0 +1,33 @@
+import time
+
+from app import db
+from live import live_publisher
+from models import DataVersion, EventStats
+
+def _next_counts(subscription, deadline):
+    while time.monotonic() < deadline:
+        for kind, payload in subscription.wait(0.1):
+            if kind == 'counts':
+                return payload
+    return None
+
+def test_writes_from_another_worker_reach_subscribers(app, make_event, monkeypatch):
+    monkeypatch.setitem(app.config, 'LIVE_UPDATE_INTERVAL', 0.05)
+    event = make_event()
+    with app.app_context():
+        EventStats.backfill()
+    subscription = live_publisher.subscribe([event.id])
+    try:
+        # What another process's registration leaves in the database; nothing calls notify here
+        with app.app_context():
+            EventStats.reserve_seat(event.id)
+            DataVersion.bump('registrations', event.id)
+            db.session.commit()
+
+        deadline = time.monotonic() + 5
+        payload = _next_counts(subscription, deadline)
+        while payload is not None and payload['registered'] != 1:
+            payload = _next_counts(subscription, deadline)
+        assert payload is not None and payload['id'] == event.id
+    finally:
+        live_publisher.unsubscribe(subscription)
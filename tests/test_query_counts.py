@@ -0,0 +1,54 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from models import CheckIn, Feedback, Registration
+from query_plans import PER_EVENT_ENDPOINTS, query_count
+
+# More rows than SQL_REPEAT_THRESHOLD, so a per-row query would also trip the N+1 guard
+BUSY_ROWS = 25
+
+@pytest.fixture
+def quiet_and_busy(app, make_user, make_event):
+    """Two events, one with a single registered, checked-in, rated student and one with ``BUSY_ROWS``."""
+    events = []
+    for rows in (1, BUSY_ROWS):
+        event = make_event()
+        students = [make_user() for _ in range(rows)]
+        with app.app_context():
+            for student in students:
+                db.session.add_all([
+                    Registration(user_id=student.id, event_id=event.id, status='confirmed'),
+                    CheckIn(user_id=student.id, event_id=event.id),
+                    Feedback(user_id=student.id, event_id=event.id, rating=4, created_at=datetime.utcnow()),
+                ])
+            db.session.commit()
+        events.append(event.id)
+    return events
+
+@pytest.mark.parametrize('name, url', [(name, url) for name, url, _ in PER_EVENT_ENDPOINTS])
+def test_query_count_does_not_grow_with_rows(app, quiet_and_busy, make_user, client_for, name, url):
+    quiet, busy = quiet_and_busy
+    client = client_for(make_user())
+
+    status, one_row = query_count(client, url.format(quiet))
+    assert status == 200 and one_row is not None
+    status, many_rows = query_count(client, url.format(busy))
+    assert status == 200
+    assert many_rows == one_row, f'{name}: {one_row} queries for 1 row, {many_rows} for {BUSY_ROWS}'
+
+def test_student_dashboard_loads_registered_events_together(app, make_user, make_event, make_registration,
+                                                             client_for):
+    student = make_user()
+    client = client_for(student)
+    make_registration(student, make_event())
+    # The first request also builds the college's upcoming-events index
+    client.get('/student/dashboard')
+    _, one_event = query_count(client, '/student/dashboard')
+
+    for _ in range(4):
+        make_registration(student, make_event())
+    status, five_events = query_count(client, '/student/dashboard')
+    assert status == 200
+    assert five_events == one_event
@@ -0,0 +1,8 @@
+from query_plans import explain, full_scans, hot_path_queries
+
+def test_hot_path_queries_use_indexes(app, make_user, make_event):
+    student, event = make_user(), make_event()
+    with app.app_context():
+        scans = {name: full_scans(explain(stmt))
+                 for name, stmt in hot_path_queries(event.college_id, student.id, event.id)}
+    assert {name: lines for name, lines in scans.items() if lines} == {}
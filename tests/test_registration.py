@@ -0,0 +1,51 @@
+import threading
+import time
+
+from app import db
+from models import EventStats, Registration
+
+# Registrations per second the contended run must sustain. Lock waits put it well below the sequential
+# rate on SQLite, so the floor is loose: it catches requests stalling on the 5 s busy timeout, not noise
+MIN_THROUGHPUT = 5
+
+def _statuses(event_id):
+    return dict(db.session.query(Registration.status, db.func.count(Registration.id))
+                          .filter_by(event_id=event_id).group_by(Registration.status).all())
+
+def test_parallel_registrations_confirm_exactly_capacity(app, make_user, make_event, client_for, record_property):
+    capacity, students = 5, 20
+    event = make_event(max_participants=capacity)
+    clients = [client_for(make_user()) for _ in range(students)]
+
+    # Release every request at once so the seat reservations really race, and time from that moment
+    started = []
+    start = threading.Barrier(students, action=lambda: started.append(time.perf_counter()))
+    responses = []
+    def register(client):
+        start.wait()
+        responses.append(client.post(f'/register_event/{event.id}').status_code)
+
+    threads = [threading.Thread(target=register, args=(client,)) for client in clients]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started[0]
+    throughput = students / elapsed
+    record_property('registrations_per_second', round(throughput, 1))
+    print(f'{students} parallel registrations in {elapsed * 1000:.0f} ms ({throughput:.0f}/s)')
+
+    assert responses == [302] * students
+    assert throughput >= MIN_THROUGHPUT
+    with app.app_context():
+        assert _statuses(event.id) == {'confirmed': capacity, 'waitlist': students - capacity}
+        assert db.session.get(EventStats, event.id).confirmed_count == capacity
+
+def test_registration_without_capacity_is_always_confirmed(app, make_user, make_event, client_for):
+    event = make_event()
+    for _ in range(3):
+        client_for(make_user()).post(f'/register_event/{event.id}')
+
+    with app.app_context():
+        assert _statuses(event.id) == {'confirmed': 3}
+        assert db.session.get(EventStats, event.id).confirmed_count == 3
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from models import Event, EventSeries, EventStats, Registration, SeriesOccurrence
+from series import materialize
+
+@pytest.fixture
+def weekly_series(app):
+    """Three weekly occurrences, starting tomorrow, of a one-seat workshop; yields (series id, event ids)."""
+    with app.app_context():
+        series = EventSeries(title='Weekly lab', description='', event_type='workshop', venue='Lab 1',
+                             max_participants=1, first_start=datetime.utcnow() + timedelta(days=1),
+                             duration_minutes=60, frequency='weekly', interval=1, occurrence_limit=3,
+                             college_id=1, created_by=1)
+        db.session.add(series)
+        db.session.commit()
+        materialize(series)
+        event_ids = [event_id for event_id, in db.session.query(SeriesOccurrence.event_id)
+                                                         .filter_by(series_id=series.id)
+                                                         .order_by(SeriesOccurrence.starts_at)]
+        return series.id, event_ids
+
+def _edit(client, series_id, **form):
+    form = {"title": 'Weekly lab', "description": '', "event_type": 'workshop', "venue": 'Lab 1',
+            "max_participants": '1', **form}
+    return client.post(f'/admin/series/{series_id}', data=form)
+
+def test_occurrences_are_linked_to_their_own_events(app, weekly_series):
+    series_id, event_ids = weekly_series
+    with app.app_context():
+        links = db.session.query(SeriesOccurrence.starts_at, Event.start_time, EventStats.event_id)\
+                          .join(Event, Event.id == SeriesOccurrence.event_id)\
+                          .outerjoin(EventStats, EventStats.event_id == Event.id)\
+                          .filter(SeriesOccurrence.series_id == series_id).all()
+    assert len(set(event_ids)) == len(links) == 3
+    assert all(starts_at == start_time and stats is not None for starts_at, start_time, stats in links)
+
+@pytest.mark.parametrize('capacity', ['many', '0', '-2', '1.5'])
+def test_invalid_capacity_is_rejected_with_a_message(app, weekly_series, make_user, client_for, capacity):
+    series_id, _ = weekly_series
+    admin = client_for(make_user(role='admin'))
+    response = _edit(admin, series_id, title='Not saved', max_participants=capacity)
+    assert response.status_code == 302
+    with admin.session_transaction() as session:
+        assert [category for category, _ in session['_flashes']] == ['error']
+    with app.app_context():
+        series = db.session.get(EventSeries, series_id)
+        assert (series.title, series.max_participants) == ('Weekly lab', 1)
+
+def test_raising_capacity_promotes_the_waitlist_in_order(app, weekly_series, make_user, client_for):
+    series_id, (event_id, *_) = weekly_series
+    students = [make_user() for _ in range(3)]
+    for student in students:
+        client_for(student).post(f'/register_event/{event_id}')
+
+    _edit(client_for(make_user(role='admin')), series_id, max_participants='2')
+
+    with app.app_context():
+        statuses = dict(db.session.query(Registration.user_id, Registration.status).filter_by(event_id=event_id))
+    assert [statuses[student.id] for student in students] == ['confirmed', 'confirmed', 'waitlist']
+
+def test_saving_keeps_occurrences_deactivated_one_by_one(app, weekly_series, make_user, client_for):
+    series_id, (first, second, third) = weekly_series
+    with app.app_context():
+        db.session.get(Event, second).is_active = False
+        db.session.commit()
+
+    admin = client_for(make_user(role='admin'))
+    _edit(admin, series_id, title='Weekly lab (room change)')
+    with app.app_context():
+        events = {event.id: event for event in Event.query.filter(Event.id.in_([first, second, third]))}
+        assert {event.title for event in events.values()} == {'Weekly lab (room change)'}
+        assert [events[i].is_active for i in (first, second, third)] == [True, False, True]
+
+    # Ending the series does reach every occurrence
+    _edit(admin, series_id, end_series='1')
+    with app.app_context():
+        assert not any(event.is_active for event in Event.query.filter(Event.id.in_([first, second, third])))
+
+def test_edits_invalidate_conditional_responses(app, weekly_series, make_user, client_for):
+    series_id, (event_id, *_) = weekly_series
+    client = app.test_client()
+    before = client.get(f'/event/{event_id}/registrations')
+
+    _edit(client_for(make_user(role='admin')), series_id, title='Renamed lab')
+
+    after = client.get(f'/event/{event_id}/registrations', headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.get_json()["event"] == 'Renamed lab'
+
+def _create(client, title, **form):
+    start = datetime.utcnow() + timedelta(days=1)
+    return client.post('/admin/create_event', data={
+        "title": title, "description": '', "event_type": 'workshop', "venue": 'Lab 1',
+        "start_time": start.strftime('%Y-%m-%dT%H:%M'),
+        "end_time": (start + timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M'), "repeat": 'weekly', **form})
+
+def test_creating_a_series_with_invalid_capacity_is_rejected(app, make_user, client_for):
+    response = _create(client_for(make_user(role='admin')), 'Capacity check', max_participants='ten',
+                       repeat_count='2')
+    assert response.status_code == 302
+    with app.app_context():
+        assert EventSeries.query.filter_by(title='Capacity check').count() == 0
+
+def test_materializing_inserts_occurrences_in_bulk(app, make_user, client_for):
+    # More occurrences than SQL_REPEAT_THRESHOLD: a row-at-a-time insert would trip the N+1 guard
+    response = _create(client_for(make_user(role='admin')), 'Term lab', max_participants='30',
+                       repeat_count='25', materialize_all='1')
+    assert response.status_code == 302
+    with app.app_context():
+        series = EventSeries.query.filter_by(title='Term lab').one()
+        assert SeriesOccurrence.query.filter_by(series_id=series.id).count() == 25
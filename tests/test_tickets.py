@@ -0,0 +1,48 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from tickets import TicketError, issue_ticket, verify_ticket
+
+@pytest.fixture
+def server_zone(monkeypatch):
+    """Run the test with the process in another local time zone; event times stay naive UTC."""
+    def use(zone):
+        monkeypatch.setenv('TZ', zone)
+        time.tzset()
+    yield use
+    monkeypatch.undo()
+    time.tzset()
+
+def _ticket(app, make_user, make_event, make_registration, start):
+    student = make_user()
+    event = make_event(start=start, hours=2)
+    registration = make_registration(student, event)
+    with app.app_context():
+        return issue_ticket(registration, event), event
+
+@pytest.mark.parametrize('zone', ['Asia/Kolkata', 'America/Los_Angeles'])
+def test_ticket_for_a_running_event_is_accepted(app, make_user, make_event, make_registration, server_zone, zone):
+    server_zone(zone)
+    token, event = _ticket(app, make_user, make_event, make_registration, datetime.utcnow() - timedelta(hours=1))
+    with app.app_context():
+        ticket = verify_ticket(token)
+    assert ticket.event_id == event.id
+    grace = timedelta(seconds=app.config['TICKET_VALID_AFTER_END'])
+    assert ticket.expires_at == event.end_time.replace(microsecond=0) + grace
+
+@pytest.mark.parametrize('zone', ['Asia/Kolkata', 'America/Los_Angeles'])
+def test_ticket_expires_after_the_grace_period(app, make_user, make_event, make_registration, server_zone, zone):
+    server_zone(zone)
+    # Ended two hours ago; TICKET_VALID_AFTER_END is one hour
+    token, _ = _ticket(app, make_user, make_event, make_registration, datetime.utcnow() - timedelta(hours=4))
+    with app.app_context(), pytest.raises(TicketError) as error:
+        verify_ticket(token)
+    assert error.value.reason == 'expired'
+
+def test_my_events_shows_the_ticket_qr_code(app, make_user, make_event, make_registration, client_for):
+    student = make_user()
+    make_registration(student, make_event())
+    page = client_for(student).get('/student/my_events').get_data(as_text=True)
+    assert 'src="data:image/svg+xml' in page
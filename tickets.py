@@ -0,0 +1,123 @@
+import calendar
+import hashlib
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from app import app, db
+from models import Event, Registration, TicketRevocation
+
+try:
+    import segno
+except ImportError:
+    segno = None
+
+Ticket = namedtuple('Ticket', 'registration_id user_id event_id college_id expires_at')
+
+class TicketError(ValueError):
+    """A scanned ticket that must not admit anyone; ``reason`` is 'invalid', 'expired' or 'revoked'."""
+
+    def __init__(self, reason):
+        super().__init__(f'Ticket {reason}')
+        self.reason = reason
+
+def _serializer():
+    return URLSafeSerializer(current_app.secret_key, salt='event-ticket',
+                             signer_kwargs={'digest_method': hashlib.sha256})
+
+def _valid_until(event_end):
+    return event_end + timedelta(seconds=current_app.config['TICKET_VALID_AFTER_END'])
+
+def issue_ticket(registration, event):
+    """Signed ticket for a confirmed registration, valid until shortly after the event ends.
+
+    The token is deterministic, so rendering it again yields the same code.
+    """
+    # Event times are naive UTC; timegm reads them as UTC whatever the server's local zone
+    expires_at = calendar.timegm(_valid_until(event.end_time).utctimetuple())
+    return _serializer().dumps([registration.id, registration.user_id, event.id, event.college_id, expires_at])
+
+def ticket_qr(token):
+    """QR code for a ticket as an SVG data URI, or None when segno is not installed."""
+    if segno is None:
+        return None
+    return segno.make(token, error='m').svg_data_uri(scale=4, border=2)
+
+class RevocationList:
+    """Cancelled registrations whose tickets are refused, mirrored in process.
+
+    Scans consult the in-memory copy; it re-reads new revocations at most
+    every TICKET_REVOCATION_REFRESH seconds (and right after a local
+    cancellation), so a cancellation made on another worker takes at most
+    that long to reach this one. Entries drop out once their tickets have
+    expired anyway.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._revoked = {}
+        self._loaded_through = None
+        self._next_refresh = 0.0
+
+    def expire(self):
+        with self._lock:
+            self._next_refresh = 0.0
+
+    def is_revoked(self, registration_id):
+        if time.monotonic() >= self._next_refresh:
+            self._refresh()
+        return registration_id in self._revoked
+
+    def _refresh(self):
+        now = datetime.utcnow()
+        query = db.session.query(TicketRevocation.registration_id, TicketRevocation.event_end,
+                                 TicketRevocation.revoked_at)\
+                          .filter(TicketRevocation.event_end > now - timedelta(seconds=app.config['TICKET_VALID_AFTER_END']))
+        with self._lock:
+            since = self._loaded_through
+        if since is not None:
+            # Overlap the previous read so rows committed late with an earlier revoked_at are not missed
+            query = query.filter(TicketRevocation.revoked_at > since - timedelta(minutes=5))
+        rows = query.all()
+
+        with self._lock:
+            for registration_id, event_end, revoked_at in rows:
+                self._revoked[registration_id] = _valid_until(event_end)
+                if self._loaded_through is None or revoked_at > self._loaded_through:
+                    self._loaded_through = revoked_at
+            if self._loaded_through is None:
+                self._loaded_through = now
+            self._revoked = {k: v for k, v in self._revoked.items() if v > now}
+            self._next_refresh = time.monotonic() + app.config['TICKET_REVOCATION_REFRESH']
+
+revocations = RevocationList()
+
+def verify_ticket(token):
+    """Check a scanned ticket without touching the registration, user or event tables.
+
+    Returns a Ticket, or raises TicketError.
+    """
+    try:
+        registration_id, user_id, event_id, college_id, expires_at = _serializer().loads(token)
+    except (BadSignature, TypeError, ValueError):
+        raise TicketError('invalid')
+    if time.time() > expires_at:
+        raise TicketError('expired')
+    if revocations.is_revoked(registration_id):
+        raise TicketError('revoked')
+    return Ticket(registration_id, user_id, event_id, college_id, datetime.utcfromtimestamp(expires_at))
+
+def revoke(registration_ids):
+    """Record revocations for ``registration_ids`` in the caller's transaction, in one INSERT ... SELECT."""
+    if not registration_ids:
+        return
+    db.session.execute(
+        db.insert(TicketRevocation).from_select(
+            ['registration_id', 'event_end', 'revoked_at'],
+            db.select(Registration.id, Event.end_time, db.literal(datetime.utcnow()))
+              .join(Event, Event.id == Registration.event_id)
+              .where(Registration.id.in_(registration_ids))
+        )
+    )
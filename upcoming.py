@@ -0,0 +1,78 @@
+import threading
+from datetime import datetime, timedelta
+from flask import g
+from app import app, db
+from queries import event_total, recent_events, upcoming_events
+
+# Events per list, matching what the dashboards show
+DASHBOARD_SIZE = 5
+
+def request_now():
+    """One ``utcnow()`` per request, shared by the index lookup and the templates."""
+    if 'now' not in g:
+        g.now = datetime.utcnow()
+    return g.now
+
+class CollegeEvents:
+    """One college's dashboard lists: the next active events, the newest events and the event total."""
+
+    def __init__(self, upcoming, recent, total, expires_at):
+        self.upcoming = upcoming
+        self.recent = recent
+        self.total = total
+        self.expires_at = expires_at
+
+class UpcomingIndex:
+    """Per-college dashboard event lists held in this process.
+
+    An entry is valid until its first upcoming event starts, since that is
+    the moment the list changes shape; the registration deadline badges
+    are computed at render time. Event writes call ``invalidate``. Other
+    workers only learn of a write through UPCOMING_INDEX_MAX_AGE, which
+    bounds how long any entry is kept. The counters on the cached events
+    are as of the build; the dashboards' live stream sends current counts
+    as soon as it connects.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generations = {}
+
+    def get(self, college_id, now=None):
+        now = now or request_now()
+        with self._lock:
+            entry = self._entries.get(college_id)
+            generation = self._generations.get(college_id, 0)
+        if entry is not None and now < entry.expires_at:
+            return entry
+
+        entry = self._build(college_id, now)
+        with self._lock:
+            # An invalidation that landed while we were querying makes this build stale
+            if self._generations.get(college_id, 0) == generation:
+                self._entries[college_id] = entry
+        return entry
+
+    def invalidate(self, *college_ids):
+        with self._lock:
+            for college_id in set(college_ids):
+                if college_id is not None:
+                    self._generations[college_id] = self._generations.get(college_id, 0) + 1
+                    self._entries.pop(college_id, None)
+
+    def _build(self, college_id, now):
+        upcoming = upcoming_events(college_id, now, DASHBOARD_SIZE).all()
+        recent = recent_events(college_id, DASHBOARD_SIZE).all()
+        total = db.session.scalar(event_total(college_id))
+
+        # Detach the rows (and their joined stats) so later commits in other requests cannot expire them
+        for event in set(upcoming) | set(recent):
+            db.session.expunge(event)
+
+        expires_at = now + timedelta(seconds=app.config['UPCOMING_INDEX_MAX_AGE'])
+        if upcoming:
+            expires_at = min(expires_at, upcoming[0].start_time)
+        return CollegeEvents(upcoming, recent, total, expires_at)
+
+upcoming_index = UpcomingIndex()
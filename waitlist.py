@@ -0,0 +1,90 @@
+from collections import defaultdict
+from app import db
+from tickets import revoke
+from models import Event, EventStats, Registration, StudentActivity
+
+def _adjust(model, key, counter, deltas):
+    """Apply per-row counter deltas (``{key value: delta}``) in one UPDATE."""
+    column = getattr(model, counter)
+    db.session.execute(
+        db.update(model).where(key.in_(deltas))
+          .values({counter: column + db.case(deltas, value=key)})
+    )
+
+def promote(event_ids):
+    """Fill freed seats from the waitlists of ``event_ids``, oldest entry first.
+
+    Runs inside the caller's transaction, after it has released seats, so a
+    cancellation and the promotions it makes commit (or roll back) together.
+    The counter rows are locked first so a concurrent registration cannot
+    take the same seats. However many events are involved, this is three
+    statements: lock, promote each event's head of line, adjust the counters.
+    The caller bumps the events' ``registrations`` version as it does for the
+    cancellations. Returns ``{event_id: [promoted user ids]}`` for the events
+    that promoted anyone.
+    """
+    event_ids = sorted(set(event_ids))
+    if not event_ids:
+        return {}
+    db.session.execute(
+        db.select(EventStats.event_id).where(EventStats.event_id.in_(event_ids))
+          .order_by(EventStats.event_id).with_for_update()
+    ).all()
+
+    # Free seats per event; NULL (no capacity) promotes the whole line, like reserve_seat
+    free = db.case((Event.max_participants > 0, Event.max_participants - EventStats.confirmed_count))
+    ranked = db.select(
+        Registration.id,
+        db.func.row_number().over(partition_by=Registration.event_id, order_by=Registration.id).label('position'),
+        free.label('free')
+    ).join(Event, Event.id == Registration.event_id)\
+     .join(EventStats, EventStats.event_id == Registration.event_id)\
+     .where(Registration.event_id.in_(event_ids), Registration.status == 'waitlist')\
+     .subquery()
+    head = db.select(ranked.c.id).where(db.or_(ranked.c.free.is_(None), ranked.c.position <= ranked.c.free))
+
+    rows = db.session.execute(
+        db.update(Registration)
+          .where(Registration.id.in_(head))
+          .values(status='confirmed')
+          .returning(Registration.event_id, Registration.user_id)
+          .execution_options(synchronize_session=False)
+    ).all()
+
+    promoted = defaultdict(list)
+    for event_id, user_id in rows:
+        promoted[event_id].append(user_id)
+    if promoted:
+        _adjust(EventStats, EventStats.event_id, 'confirmed_count',
+                {event_id: len(user_ids) for event_id, user_ids in promoted.items()})
+    return dict(promoted)
+
+def cancel(registrations):
+    """Cancel ``registrations`` and promote waitlisted students into the seats they free, in one pass.
+
+    Tickets of the cancelled confirmed registrations are revoked. Returns ``(cancelled, promoted)``: the number of registrations that
+    changed and ``{event_id: [promoted user ids]}``. The caller commits.
+    """
+    released = defaultdict(int)
+    withdrawn = defaultdict(int)
+    ticketed = []
+    cancelled = 0
+    for registration in registrations:
+        if registration.status == 'cancelled':
+            continue
+        if registration.status == 'confirmed':
+            released[registration.event_id] += 1
+            ticketed.append(registration.id)
+        withdrawn[registration.user_id] += 1
+        registration.status = 'cancelled'
+        cancelled += 1
+
+    if released:
+        _adjust(EventStats, EventStats.event_id, 'confirmed_count', {k: -v for k, v in released.items()})
+    if withdrawn:
+        _adjust(StudentActivity, StudentActivity.user_id, 'registration_count', {k: -v for k, v in withdrawn.items()})
+    # Only confirmed registrations were ever shown a ticket
+    revoke(ticketed)
+    db.session.flush()
+
+    return cancelled, promote(released)